@@ -1,5 +1,11 @@
-from pydantic_settings import BaseSettings
+from datetime import date
+from pydantic import NonNegativeFloat, NonNegativeInt, field_validator
+from pydantic_settings import BaseSettings, NoDecode
 from functools import lru_cache
+from typing import Annotated, Literal, Tuple
+
+# "low,high" in the environment
+Bounds = Annotated[Tuple[float, float], NoDecode]
 
 class Settings(BaseSettings):
     postgres_user: str = "postgres"
@@ -7,6 +13,66 @@ class Settings(BaseSettings):
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_db: str = "singularity_clock"
+
+    # Async engine / connection pool
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    # Connections opened at startup (capped at db_pool_size)
+    db_pool_warmup: int = 2
+    # Seconds startup waits for those connections before giving up on them
+    db_pool_warmup_timeout: float = 10.0
+
+    # Serialize responses and data files with orjson (must be installed)
+    use_orjson: bool = False
+
+    # Background refresh pipeline (fetch -> parse -> composite -> publish)
+    refresh_enabled: bool = True
+    refresh_interval_minutes: int = 360
+    refresh_jitter_seconds: int = 600
+    refresh_initial_delay_seconds: int = 60
+    refresh_load_db: bool = True
+
+    # Sentiment submissions are buffered and written in batches
+    sentiment_batch_size: int = 500
+    sentiment_flush_interval: float = 1.0
+    sentiment_max_pending: int = 20000
+
+    # pandas CSV engine for the Epoch AI exports: "pyarrow" is faster on
+    # large exports but needs pyarrow installed
+    epoch_csv_engine: Literal["c", "python", "pyarrow"] = "c"
+    # Parse the models CSV in chunks of this many rows with bounded memory
+    # (0 = read it whole)
+    epoch_models_chunk_size: NonNegativeInt = 0
+
+    # arXiv submission counts (point the URL at a local server for a fake API)
+    arxiv_api_url: str = "http://export.arxiv.org/api/query"
+    arxiv_start_date: date = date(2018, 1, 1)
+    # arXiv asks for no more than one request every three seconds
+    arxiv_min_request_interval: NonNegativeFloat = 3.0
+    # Windows harvested per refresh run (0 = no cap)
+    arxiv_max_windows_per_run: NonNegativeInt = 26
+
+    # What 0 and 100 mean for each composite component, in the scaled space
+    composite_compute_bounds: Bounds = (15.0, 30.0)
+    composite_capability_bounds: Bounds = (0.0, 100.0)
+    composite_papers_bounds: Bounds = (0.0, 1000.0)
+
+    @field_validator("composite_compute_bounds", "composite_capability_bounds", "composite_papers_bounds", mode="before")
+    @classmethod
+    def _split_bounds(cls, value):
+        return value.split(",") if isinstance(value, str) else value
+
+    @field_validator("composite_compute_bounds", "composite_capability_bounds", "composite_papers_bounds")
+    @classmethod
+    def _check_bounds(cls, value):
+        if not value[1] > value[0]:
+            raise ValueError(f"bounds must be 'low,high' with high > low, got {value}")
+        return value
     
     @property
     def database_url(self) -> str:
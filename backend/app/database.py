@@ -1,9 +1,19 @@
 # backend/app/database.py
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 # Define Base here so models can import it without triggering engine creation
@@ -13,14 +23,77 @@ Base = declarative_base()
 _engine = None
 _async_session_maker = None
 
+
+class PoolStats:
+    """Counters for connection checkouts; shared by every pool the engine recreates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, outcome: str = "ok") -> None:
+        """Record one checkout; outcome is "ok", "timeout" or "error" (connect failed)."""
+        with self._lock:
+            if outcome == "timeout":
+                self.timeouts += 1
+            elif outcome == "error":
+                self.errors += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - start, "timeout")
+            raise
+        except Exception:
+            pool_stats.record(time.perf_counter() - start, "error")
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return connection
+
+
 def get_engine():
     """Lazy creation of async engine."""
     global _engine
     if _engine is None:
         _engine = create_async_engine(
             settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-            echo=True,
-            future=True
+            echo=settings.db_echo,
+            poolclass=InstrumentedAsyncPool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            # Per-connection LRU of prepared statements (0 disables it)
+            connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
         )
     return _engine
 
@@ -36,4 +109,61 @@ def get_session_maker():
 async def get_db():
     """FastAPI dependency that provides a database session."""
     async with get_session_maker()() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def warm_up_pool() -> int:
+    """Open db_pool_warmup connections up front so the first requests don't pay for connects.
+
+    Returns the number of connections opened. A database that is down or
+    does not answer within db_pool_warmup_timeout is logged, not raised:
+    the API still serves the JSON snapshots without it.
+    """
+    count = max(0, min(settings.db_pool_warmup, settings.db_pool_size))
+    if count == 0:
+        return 0
+    engine = get_engine()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # An unreachable host can hang in connect() well past any pool timeout
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ping(), settings.db_pool_warmup_timeout) for _ in range(count)),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        logger.warning(f"Database pool warm-up failed for {len(errors)}/{count} connections: "
+                       f"{errors[0].__class__.__name__}: {errors[0]}")
+    else:
+        logger.info(f"Database pool warmed up with {count} connections")
+    return count - len(errors)
+
+
+async def dispose_engine() -> None:
+    """Close all pooled connections (app shutdown)."""
+    global _engine, _async_session_maker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _async_session_maker = None
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Current pool occupancy plus cumulative checkout wait statistics."""
+    metrics: Dict[str, Any] = {
+        "initialized": _engine is not None,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+    }
+    if _engine is not None:
+        pool = _engine.pool
+        metrics.update(
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics.update(pool_stats.snapshot())
+    return metrics
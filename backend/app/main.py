@@ -1,6 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-app = FastAPI()
+from . import database
+from .middleware import MetricsMiddleware
+from .routes import clock, health, metrics, sentiment
+from .services import broadcast, refresh_pipeline, sentiment_buffer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.warm_up_pool()
+    await broadcast.get_hub().start()
+    await sentiment_buffer.get_buffer().start()
+    refresh_pipeline.start_scheduler()
+    yield
+    refresh_pipeline.stop_scheduler()
+    # Flush buffered submissions while the engine is still up
+    await sentiment_buffer.get_buffer().stop()
+    await broadcast.get_hub().stop()
+    await database.dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.include_router(clock.router, prefix="/api")
+app.include_router(health.router, prefix="/api")
+app.include_router(sentiment.router, prefix="/api")
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,65 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .services.metrics import HttpMetrics, http_metrics
+
+# Long-lived responses are not recorded: timing them would swamp the
+# latency histogram, and their clients are counted by the broadcast hub
+UNTIMED_PATHS = frozenset({"/api/stream"})
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, size and in-flight count per route.
+
+    Written against raw ASGI rather than BaseHTTPMiddleware so it adds no
+    extra task or body buffering to each request. The route label is the
+    matched template (``/api/history``), never the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: HttpMetrics = http_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in UNTIMED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], route_template(scope), status, time.perf_counter() - start, size)
+
+
+def route_template(scope: Scope) -> str:
+    """Full path template of the route that served a request.
+
+    Routers included with a prefix leave their own (unprefixed) route in
+    ``scope["route"]``; FastAPI records the effective, prefixed one under
+    ``scope["fastapi"]``, so that is preferred when present.
+    """
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    for route in (effective, scope.get("route")):
+        template = getattr(route, "path_format", None)
+        if template:
+            return template
+    return UNMATCHED_ROUTE
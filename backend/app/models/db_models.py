@@ -1,6 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, Float, Date, DateTime, ARRAY, JSON,
-    ForeignKey, Numeric, Boolean, func
+    Column, Integer, BigInteger, String, Float, Date, DateTime, ARRAY, JSON,
+    ForeignKey, Numeric, Boolean, CheckConstraint, Index, func
 )
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -23,7 +23,7 @@ class Model(Base):
     id = Column(Integer, primary_key=True)
     model_name = Column(String, unique=True, nullable=False)
     organization_id = Column(Integer, ForeignKey("organizations.id"))
-    publication_date = Column(Date)
+    publication_date = Column(Date, index=True)
     domain = Column(ARRAY(String))
     training_compute_flop = Column(Numeric)
     parameters = Column(Numeric)
@@ -55,6 +55,9 @@ class Benchmark(Base):
 
 class ModelBenchmarkScore(Base):
     __tablename__ = "model_benchmark_scores"
+    __table_args__ = (
+        Index("ix_model_benchmark_scores_benchmark_id_score_date", "benchmark_id", "score_date"),
+    )
 
     id = Column(Integer, primary_key=True)
     model_id = Column(Integer, ForeignKey("models.id", ondelete="CASCADE"))
@@ -73,10 +76,68 @@ class CompositeHistory(Base):
     __tablename__ = "composite_history"
 
     id = Column(Integer, primary_key=True)
-    snapshot_date = Column(Date, nullable=False)
+    snapshot_date = Column(Date, nullable=False, index=True)
     compute_component = Column(Float)
     capability_component = Column(Float)
     papers_component = Column(Float)
     composite_value = Column(Float)
     extra_data = Column(JSON)  # renamed from metadata
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class LatestComposite(Base):
+    """Single-row copy of the newest CompositeHistory snapshot.
+
+    Refreshed by the composite pipeline in the same transaction that writes
+    the history, so reading the current value is a primary-key lookup.
+    """
+    __tablename__ = "latest_composite"
+    __table_args__ = (CheckConstraint("id = 1", name="latest_composite_single_row"),)
+
+    id = Column(Integer, primary_key=True, default=1)
+    snapshot_date = Column(Date, nullable=False)
+    compute_component = Column(Float)
+    capability_component = Column(Float)
+    papers_component = Column(Float)
+    composite_value = Column(Float)
+    extra_data = Column(JSON)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SentimentAggregate(Base):
+    """Pre-aggregated distribution of sentiment submissions.
+
+    One row per UTC day plus one all-time row (period "all"), each folded
+    forward by the sentiment buffer in the same transaction that writes the
+    submissions, so distribution reads never scan sentiment_submissions.
+    """
+    __tablename__ = "sentiment_aggregates"
+
+    period = Column(String(10), primary_key=True)  # "all" or an ISO date
+    day = Column(Date, index=True)  # NULL for "all"
+    count = Column(BigInteger, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    value_min = Column(Float)
+    value_max = Column(Float)
+    histogram = Column(JSON, nullable=False)  # counts per unit-wide bin over [0, 100]
+    sketch = Column(JSON, nullable=False)  # serialized t-digest
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class SentimentSubmission(Base):
+    """One placement of the Sentiment hand by a visitor.
+
+    Rows are written in batches by the sentiment write-behind buffer, so
+    submitted_at is when the API accepted the submission and created_at is
+    when its batch reached the database.
+    """
+    __tablename__ = "sentiment_submissions"
+    __table_args__ = (
+        CheckConstraint("value >= 0 AND value <= 100", name="sentiment_submissions_value_range"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    value = Column(Float, nullable=False)
+    client_id = Column(String(64))
+    submitted_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now())
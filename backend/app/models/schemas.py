@@ -1,7 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 class ClockResponse(BaseModel):
     data_hand: float
     vibe_hand: float
     timestamp: datetime
+
+class SentimentSubmissionIn(BaseModel):
+    value: float = Field(..., ge=0, le=100, allow_inf_nan=False)
+    client_id: Optional[str] = Field(None, max_length=64)
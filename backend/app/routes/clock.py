@@ -1,8 +1,229 @@
-from fastapi import APIRouter
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..database import get_session_maker
+from ..responses import (
+    COMPRESS_MIN_BYTES, CodecJSONResponse, cache_headers, compress,
+    is_not_modified, negotiate_encoding, not_modified, variant_etag,
+)
+from ..services import broadcast, composite_pipeline, data_store, json_codec
+from ..services.downsample import lttb_indices
+from ..services.metrics import http_metrics
+
+router = APIRouter(default_response_class=CodecJSONResponse)
+
+# Upper bound on ?points= so a single request can't ask for the whole table
+MAX_HISTORY_POINTS = 5000
+
+# /current stays fresh for 10% of the snapshot's age, within these bounds
+CURRENT_MIN_MAX_AGE = 30
+CURRENT_MAX_MAX_AGE = 900
+CURRENT_STALE_WHILE_REVALIDATE = 60
+
+# Served until the first refresh writes current.json (a fresh deploy or a
+# wiped data directory). It is never cached, so clients pick up the first
+# real snapshot as soon as it exists.
+PENDING_CURRENT = {"data_hand": 42.0, "vibe_hand": 50.0, "status": "pending"}
+
+# History only changes when the pipeline rewrites CompositeHistory
+HISTORY_MAX_AGE = 300
+HISTORY_STALE_WHILE_REVALIDATE = 3600
+HISTORY_CACHE_ENTRIES = 64
+
+
+class RenderedHistory(NamedTuple):
+    etag: str
+    last_modified: Optional[float]
+    # Body per content coding (None = identity), filled in lazily
+    bodies: Dict[Optional[str], bytes]
+
+
+# (from, to, points, version) -> rendered response, most recently used last
+_history_cache: "OrderedDict[Tuple, RenderedHistory]" = OrderedDict()
+
+
+# Compressed bodies of the latest snapshot, by (snapshot ETag, coding)
+_current_encoded: Dict[Tuple[str, str], bytes] = {}
+
+
+def current_max_age(last_modified: float) -> int:
+    age = max(time.time() - last_modified, 0.0)
+    return int(min(max(age * 0.1, CURRENT_MIN_MAX_AGE), CURRENT_MAX_MAX_AGE))
 
-router = APIRouter()
 
 @router.get("/current")
-async def get_current():
-    # TODO: return current composite value
-    return {"data_hand": 42.0, "vibe_hand": 50.0}
+async def get_current(request: Request):
+    """The latest published clock state, or PENDING_CURRENT before the first refresh.
+
+    Snapshots of COMPRESS_MIN_BYTES or more are compressed as /history is,
+    with a per-coding ETag.
+    """
+    snapshot = data_store.get_current_snapshot()
+    if snapshot is None:
+        return CodecJSONResponse(PENDING_CURRENT, headers={"Cache-Control": "no-store"})
+    # Snapshots are usually below the threshold, so the identity body goes out as is
+    compressible = len(snapshot.body) >= COMPRESS_MIN_BYTES
+    coding = negotiate_encoding(request) if compressible else None
+    headers = cache_headers(
+        variant_etag(snapshot.etag, coding),
+        snapshot.last_modified,
+        current_max_age(snapshot.last_modified),
+        CURRENT_STALE_WHILE_REVALIDATE,
+    )
+    if compressible:
+        headers["Vary"] = "Accept-Encoding"
+    fresh = is_not_modified(request, headers["ETag"], snapshot.last_modified)
+    http_metrics.cache_result("current_conditional", fresh)
+    if fresh:
+        return not_modified(headers)
+    if coding is None:
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+    body = _current_encoded.get((snapshot.etag, coding))
+    if body is None:
+        if any(etag != snapshot.etag for etag, _ in _current_encoded):
+            _current_encoded.clear()
+        body = _current_encoded[(snapshot.etag, coding)] = compress(snapshot.body, coding)
+    headers["Content-Encoding"] = coding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/history")
+async def get_history(
+    request: Request,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    points: int = Query(500, ge=2, le=MAX_HISTORY_POINTS),
+):
+    """Composite and component series in [from, to], LTTB-downsampled to at most ``points``.
+
+    Points are picked on the composite series and the components are
+    sampled at the same dates, so all series stay aligned. Responses are
+    keyed on latest_composite.updated_at, which the process keeps for
+    composite_pipeline.LATEST_VERSION_TTL seconds. Within that window a
+    revalidation, or a repeat of a rendered query, touches no storage at
+    all. Rendered bodies are reused until the pipeline writes new
+    snapshots. Large bodies are gzip/brotli compressed.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+    coding = negotiate_encoding(request)
+    try:
+        known, version = composite_pipeline.cached_latest_version()
+        if not known:
+            async with get_session_maker()() as session:
+                latest = await composite_pipeline.get_latest_composite(session)
+            version = latest.updated_at if latest is not None else None
+        key = (start, end, points, version)
+        if version is not None:
+            base_etag, last_modified = _history_validators(version, start, end, points)
+            for etag in (base_etag, variant_etag(base_etag, coding)):
+                if is_not_modified(request, etag, last_modified):
+                    http_metrics.cache_result("history_conditional", True)
+                    return not_modified(_history_headers(etag, last_modified))
+        http_metrics.cache_result("history_conditional", False)
+
+        rendered = _history_cache.get(key) if version is not None else None
+        http_metrics.cache_result("history_render", rendered is not None)
+        if rendered is None:
+            async with get_session_maker()() as session:
+                dates, series = await composite_pipeline.read_composite_range(session, start, end)
+            rendered = _render_history(start, end, points, dates, series, version)
+            if version is not None:
+                _history_cache[key] = rendered
+                while len(_history_cache) > HISTORY_CACHE_ENTRIES:
+                    _history_cache.popitem(last=False)
+        else:
+            _history_cache.move_to_end(key)
+    except (SQLAlchemyError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"History unavailable: {e.__class__.__name__}")
+
+    identity = rendered.bodies[None]
+    if len(identity) < COMPRESS_MIN_BYTES:
+        coding = None
+    etag = variant_etag(rendered.etag, coding)
+    headers = _history_headers(etag, rendered.last_modified)
+    if is_not_modified(request, etag, rendered.last_modified):
+        return not_modified(headers)
+
+    if coding is not None:
+        http_metrics.cache_result("history_encoding", coding in rendered.bodies)
+    if coding not in rendered.bodies:
+        rendered.bodies[coding] = compress(identity, coding)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(content=rendered.bodies[coding], media_type="application/json", headers=headers)
+
+
+@router.get("/stream")
+async def stream_current(request: Request):
+    """Server-Sent Events: a ``current`` event with the snapshot now and on every change.
+
+    All clients share one broadcast hub; a client that falls behind is
+    disconnected and resumes via EventSource's automatic reconnect.
+    """
+    hub = broadcast.get_hub()
+    subscriber = hub.subscribe(request.headers.get("last-event-id"))
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many stream clients", headers={"Retry-After": "30"})
+
+    async def frames():
+        try:
+            yield f"retry: {broadcast.RETRY_MS}\n\n".encode("ascii")
+            while True:
+                frame = await subscriber.next_frame(broadcast.HEARTBEAT_INTERVAL)
+                if subscriber.closed:
+                    break
+                yield frame if frame is not None else b": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _history_validators(version, start, end, points) -> Tuple[str, float]:
+    """ETag and Last-Modified for a history query at a given latest_composite version."""
+    digest = hashlib.blake2b(
+        "|".join(map(str, (version.isoformat(), start, end, points, json_codec.backend()))).encode("utf-8"),
+        digest_size=12,
+    )
+    return '"' + digest.hexdigest() + '"', version.timestamp()
+
+
+def _history_headers(etag: str, last_modified: Optional[float]) -> Dict[str, str]:
+    headers = cache_headers(etag, last_modified, HISTORY_MAX_AGE, HISTORY_STALE_WHILE_REVALIDATE)
+    headers["Vary"] = "Accept-Encoding"
+    return headers
+
+
+def _render_history(start, end, points, dates, series, version) -> RenderedHistory:
+    x = dates.astype("int64")
+    keep = lttb_indices(x, series["composite_value"], points)
+    body = json_codec.dumps({
+        "from": start,
+        "to": end,
+        "total": len(dates),
+        "points": len(keep),
+        "dates": np.datetime_as_string(dates[keep]).tolist(),
+        **{
+            name: [None if np.isnan(v) else round(float(v), 4) for v in values[keep]]
+            for name, values in series.items()
+        },
+    })
+    if version is not None:
+        etag, last_modified = _history_validators(version, start, end, points)
+    else:
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        last_modified = None
+    return RenderedHistory(etag, last_modified, {None: body})
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+
+from .. import database
+from ..services import broadcast, refresh_pipeline, sentiment_buffer
+from ..responses import CodecJSONResponse
+
+router = APIRouter(default_response_class=CodecJSONResponse)
+
+@router.get("/health")
+async def get_health():
+    return {
+        "status": "ok",
+        "database_pool": database.get_pool_metrics(),
+        "stream": broadcast.get_hub().stats(),
+        "sentiment": sentiment_buffer.get_buffer().stats(),
+        "refresh": refresh_pipeline.get_last_report(),
+    }
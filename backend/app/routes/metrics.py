@@ -0,0 +1,52 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from .. import database
+from ..services import broadcast, metrics, pipeline_metrics, refresh_pipeline, sentiment_buffer
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of request, cache, pool, stream and refresh metrics."""
+    lines = metrics.http_metrics.render()
+
+    pool = database.get_pool_metrics()
+    lines += metrics.gauge_lines("db_pool_connections", "Pooled database connections by state.", [
+        ({"state": "checked_out"}, pool.get("checked_out")),
+        ({"state": "checked_in"}, pool.get("checked_in")),
+        ({"state": "overflow"}, pool.get("overflow")),
+    ])
+    lines += metrics.counter_lines("db_pool_checkouts_total", "Pool checkouts by outcome.", [
+        ({"outcome": "ok"}, pool["checkouts"]),
+        ({"outcome": "timeout"}, pool["timeouts"]),
+        ({"outcome": "error"}, pool["errors"]),
+    ])
+    lines += metrics.gauge_lines("db_pool_wait_seconds_max", "Longest wait for a pooled connection.", [
+        ({}, pool["wait_seconds_max"]),
+    ])
+
+    stream = broadcast.get_hub().stats()
+    lines += metrics.gauge_lines("stream_clients", "Connected /api/stream clients.", [({}, stream["clients"])])
+    lines += metrics.counter_lines("stream_events_total", "Stream events by kind.", [
+        ({"kind": "published"}, stream["published"]),
+        ({"kind": "evicted"}, stream["evicted"]),
+    ])
+
+    sentiment = sentiment_buffer.get_buffer().stats()
+    lines += metrics.gauge_lines("sentiment_buffer_pending", "Sentiment submissions waiting to be written.", [
+        ({}, sentiment["pending"]),
+    ])
+    lines += metrics.counter_lines("sentiment_submissions_total", "Sentiment submissions by outcome.", [
+        ({"outcome": outcome}, sentiment[outcome]) for outcome in ("accepted", "rejected", "written", "dropped")
+    ])
+
+    # Per-stage metrics of the last in-process refresh run
+    report = refresh_pipeline.get_last_report()
+    body = "\n".join(lines) + "\n"
+    if report and report.get("stages"):
+        run = refresh_pipeline.pipeline_report(report)
+        if run["stages"]:
+            body += pipeline_metrics.render_prometheus(run)
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
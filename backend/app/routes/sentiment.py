@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..models.schemas import SentimentSubmissionIn
+from ..responses import CodecJSONResponse
+from ..services import sentiment_aggregates, sentiment_buffer
+
+router = APIRouter(default_response_class=CodecJSONResponse)
+
+# Seconds a client is asked to wait when the buffer is full
+RETRY_AFTER = 5
+
+
+@router.post("/sentiment", status_code=202)
+async def submit_sentiment(submission: SentimentSubmissionIn):
+    """Queue a Sentiment hand placement; it is written to the database in the next batch."""
+    if not sentiment_buffer.get_buffer().submit(submission.value, submission.client_id):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending submissions, try again shortly",
+            headers={"Retry-After": str(RETRY_AFTER)},
+        )
+    return {"status": "queued"}
+
+
+@router.get("/sentiment/distribution")
+async def get_sentiment_distribution(
+    day: Optional[date] = Query(None, description="UTC day; all time when omitted"),
+    bins: int = Query(20, ge=1, le=sentiment_aggregates.HISTOGRAM_BINS),
+    session: AsyncSession = Depends(get_db),
+):
+    """Where others placed their Sentiment hand: histogram, mean and quantiles.
+
+    Served from the pre-aggregated rows, so the cost does not grow with the
+    number of submissions.
+    """
+    if sentiment_aggregates.HISTOGRAM_BINS % bins:
+        raise HTTPException(status_code=422, detail=f"'bins' must divide {sentiment_aggregates.HISTOGRAM_BINS}")
+    try:
+        dist = await sentiment_aggregates.read_distribution(session, day)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=503, detail=f"Distribution unavailable: {e.__class__.__name__}")
+    if dist is None:
+        dist = sentiment_aggregates.Distribution()
+    return {"day": day, **dist.summary(bins)}
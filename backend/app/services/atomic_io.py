@@ -0,0 +1,78 @@
+"""Crash-safe file writes for everything under DATA_DIR.
+
+Writers go to a temporary file in the target's directory, fsync it and
+``os.replace`` it over the target, so readers always see either the old or
+the new complete file and never need locks or retries.
+"""
+
+import json
+import os
+import tempfile
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+def fsync_directory(directory: PathLike) -> None:
+    """Flush a directory entry to disk (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path: PathLike, mode: str = "wb", fsync_dir: bool = True) -> Iterator[BinaryIO]:
+    """Open a binary temp file that replaces ``path`` only if the block succeeds."""
+    if "b" not in mode or "r" in mode or "a" in mode:
+        raise ValueError(f"atomic_open only supports binary write modes, got {mode!r}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync_dir:
+        fsync_directory(path.parent)
+
+
+def atomic_write_bytes(path: PathLike, data: bytes, fsync_dir: bool = True) -> None:
+    """Atomically replace ``path`` with ``data``."""
+    with atomic_open(path, fsync_dir=fsync_dir) as f:
+        f.write(data)
+
+
+def atomic_write_text(path: PathLike, text: str, encoding: str = "utf-8", fsync_dir: bool = True) -> None:
+    """Atomically replace ``path`` with ``text``."""
+    atomic_write_bytes(path, text.encode(encoding), fsync_dir=fsync_dir)
+
+
+def atomic_write_json(path: PathLike, obj: Any, fsync_dir: bool = True, **dump_kwargs) -> None:
+    """Atomically replace ``path`` with ``obj`` serialized as JSON.
+
+    Defaults to the store's historical ``indent=2, default=str`` format.
+    """
+    dump_kwargs.setdefault("indent", 2)
+    dump_kwargs.setdefault("default", str)
+    atomic_write_text(path, json.dumps(obj, **dump_kwargs), fsync_dir=fsync_dir)
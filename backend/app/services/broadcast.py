@@ -0,0 +1,190 @@
+"""In-process fan-out of clock updates to streaming clients.
+
+One ``BroadcastHub`` per process holds a bounded queue per connected
+client. A new snapshot is encoded once as an SSE frame and put on every
+queue without waiting; a client whose queue is full is too slow to keep
+up and is evicted (its stream ends and the browser reconnects and catches
+up from the latest frame). Publishing therefore never blocks on clients.
+
+Snapshots reach the hub two ways: ``data_store.write_current`` in this
+process notifies it directly, and a watcher task picks up writes made by
+other processes (the API worker holding the refresh lock, or
+``scripts/update_data.py``) through the current-state cache's mtime check,
+run in a worker thread.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from . import data_store
+
+logger = logging.getLogger(__name__)
+
+# Frames a client may fall behind before it is evicted
+CLIENT_QUEUE_SIZE = 8
+# Open streams per process; further clients get 503
+MAX_CLIENTS = 10000
+# How often the watcher checks for writes from other processes (seconds)
+WATCH_INTERVAL = 2.0
+# Comment frames keep idle connections open through proxies (seconds)
+HEARTBEAT_INTERVAL = 15.0
+# Reconnect delay suggested to EventSource clients (milliseconds)
+RETRY_MS = 5000
+
+_CLOSE = object()
+
+
+def sse_frame(snapshot: data_store.CurrentSnapshot) -> bytes:
+    """Encode a snapshot as one ``current`` event, id'd by its ETag."""
+    return b"".join([
+        b"id: ", snapshot.etag.strip('"').encode("ascii"), b"\n",
+        b"event: current\n",
+        b"data: ", snapshot.body, b"\n\n",
+    ])
+
+
+class Subscriber:
+    """One connected client's queue of pending frames."""
+
+    __slots__ = ("queue", "closed")
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    async def next_frame(self, timeout: float) -> Optional[bytes]:
+        """The next frame; None on timeout or once the hub has closed this subscriber."""
+        try:
+            item = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return None if item is _CLOSE else item
+
+
+class BroadcastHub:
+    """Fans out snapshot frames to subscribers; all methods run on the event loop."""
+
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE, max_clients: int = MAX_CLIENTS):
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self._subscribers: Set[Subscriber] = set()
+        self._last_etag: Optional[str] = None
+        self._last_frame: Optional[bytes] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self.published = 0
+        self.evicted = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        data_store.add_current_listener(self.notify)
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        data_store.remove_current_listener(self.notify)
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
+        self._loop = None
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                # The revalidation stats and may re-read current.json; keep that off the loop
+                snapshot = await asyncio.to_thread(data_store.get_current_snapshot)
+                if snapshot is not None:
+                    self.publish(snapshot)
+            except Exception as e:
+                logger.warning(f"Current-state watcher failed: {e}")
+            await asyncio.sleep(WATCH_INTERVAL)
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def notify(self, snapshot: data_store.CurrentSnapshot) -> None:
+        """Thread-safe entry point used by data_store.write_current."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.publish(snapshot)
+        else:
+            loop.call_soon_threadsafe(self.publish, snapshot)
+
+    def publish(self, snapshot: data_store.CurrentSnapshot) -> int:
+        """Queue a snapshot for every client (once per distinct ETag); returns clients reached."""
+        if snapshot.etag == self._last_etag:
+            return 0
+        frame = sse_frame(snapshot)
+        self._last_etag, self._last_frame = snapshot.etag, frame
+        self.published += 1
+
+        delivered = 0
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+                delivered += 1
+            except asyncio.QueueFull:
+                self.evicted += 1
+                self._close(subscriber)
+                logger.info("Evicted a slow stream client")
+        return delivered
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscriber]:
+        """Register a client (None if the hub is full); it starts with the latest frame."""
+        if len(self._subscribers) >= self.max_clients:
+            return None
+        subscriber = Subscriber(self.queue_size)
+        if self._last_frame is not None and last_event_id != self._last_etag.strip('"'):
+            subscriber.queue.put_nowait(self._last_frame)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _close(self, subscriber: Subscriber) -> None:
+        """Drop a subscriber and wake its stream so it ends."""
+        self._subscribers.discard(subscriber)
+        subscriber.closed = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(_CLOSE)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "evicted": self.evicted,
+        }
+
+
+_hub: Optional[BroadcastHub] = None
+
+
+def get_hub() -> BroadcastHub:
+    """Lazy creation of the process-wide hub."""
+    global _hub
+    if _hub is None:
+        _hub = BroadcastHub()
+    return _hub
@@ -0,0 +1,72 @@
+"""Typed columnar snapshots of parsed tables (Arrow IPC files).
+
+The parse stage writes each Epoch table once as an uncompressed Arrow IPC
+file; readers memory-map it and take only the columns they ask for, so a
+read costs page faults on those columns rather than a CSV or JSON parse,
+and dates and numbers keep their types. Writes go through ``atomic_open``,
+and a reader that has the old file mapped keeps seeing it after a replace.
+
+``pyarrow`` is listed in requirements.txt but still treated as optional.
+Without it ``available()`` is False and nothing is written. The parse stage
+logs a warning for each skipped snapshot, and callers fall back to reading
+the CSVs.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from .atomic_io import atomic_open
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+PathLike = Union[str, Path]
+
+SNAPSHOT_SUFFIX = ".arrow"
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def write_frame(path: PathLike, df: pd.DataFrame, metadata: Optional[Dict[str, str]] = None) -> None:
+    """Atomically write a frame as an Arrow IPC file, with string metadata in its schema."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata.update({k.encode("utf-8"): v.encode("utf-8") for k, v in (metadata or {}).items()})
+    table = table.replace_schema_metadata(schema_metadata)
+    with atomic_open(path) as f:
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_metadata(path: PathLike) -> Optional[Dict[str, str]]:
+    """Schema metadata of a snapshot without reading its data; None if missing or unreadable."""
+    if pa is None:
+        return None
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return {k.decode("utf-8"): v.decode("utf-8") for k, v in (schema.metadata or {}).items()
+            if k != b"pandas"}
+
+
+def read_table(path: PathLike, columns: Optional[Sequence[str]] = None) -> "pa.Table":
+    """Memory-mapped, zero-copy read of a snapshot; ``columns`` not in the file are ignored."""
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if columns is not None:
+        table = table.select([name for name in columns if name in table.column_names])
+    return table
+
+
+def read_frame(path: PathLike, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """A snapshot (or some of its columns) as a DataFrame."""
+    return read_table(path, columns).to_pandas()
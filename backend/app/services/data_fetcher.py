@@ -7,6 +7,9 @@ def fetch_epoch_capabilities():
     # TODO
     pass
 
-def fetch_arxiv_counts():
-    # TODO
-    pass
+def fetch_arxiv_counts(until=None):
+    """Harvest new arXiv days and return daily paper counts keyed by date."""
+    from .etl import arxiv_ingest
+
+    arxiv_ingest.harvest(until=until)
+    return arxiv_ingest.load_paper_counts()
@@ -1,58 +1,197 @@
 """Read/write JSON data files."""
 
-import json
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 import logging
 
+from . import json_codec
+from .atomic_io import atomic_write_bytes
+from .history_store import HistoryStore, TimestampLike
+
 logger = logging.getLogger(__name__)
 
 # Get the data directory (two levels up from this file)
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 
+# History is kept as an append-only segmented log under DATA_DIR/history.
+# Retention is HISTORY_SEGMENT_ENTRIES * HISTORY_MAX_SEGMENTS = 10,000
+# entries (the single history.json this replaced kept 1,000).
+HISTORY_DIR = DATA_DIR / "history"
+HISTORY_SEGMENT_ENTRIES = 1000
+HISTORY_MAX_SEGMENTS = 10
+
+# How long read_current trusts its in-memory copy before re-checking the
+# file's mtime/inode. write_current in this process pushes immediately.
+CURRENT_REVALIDATE_SECONDS = 1.0
+
+_history_store: Optional[HistoryStore] = None
+
+
+class CurrentSnapshot(NamedTuple):
+    """Parsed current state plus its pre-serialized response body."""
+    data: Dict[str, Any]
+    body: bytes
+    etag: str
+    # Epoch seconds the state was produced (its "timestamp", else file mtime)
+    last_modified: float
+
+
+def _snapshot_time(data: Dict[str, Any], fallback: float) -> float:
+    """The state's own timestamp as epoch seconds, never later than now."""
+    try:
+        ts = datetime.fromisoformat(str(data["timestamp"])).timestamp()
+    except (KeyError, TypeError, ValueError):
+        ts = fallback
+    return min(ts, time.time())
+
+
+class CurrentStateCache:
+    """Keeps current.json parsed and serialized in memory.
+
+    The file is only re-read when its inode, mtime or size changes, and that
+    is checked at most once per ``revalidate_interval`` seconds, so steady
+    state reads touch neither the disk nor the JSON encoder.
+    """
+
+    def __init__(self, revalidate_interval: float = CURRENT_REVALIDATE_SECONDS):
+        self.revalidate_interval = revalidate_interval
+        self._snapshot: Optional[CurrentSnapshot] = None
+        # () means "never checked"; None means "file missing".
+        self._stat_key: Optional[Tuple[int, ...]] = ()
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _path() -> Path:
+        return DATA_DIR / "current.json"
+
+    @staticmethod
+    def _stat_key_for(path: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _build(data: Dict[str, Any], mtime: float) -> CurrentSnapshot:
+        body = json_codec.dumps(data)
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return CurrentSnapshot(data, body, etag, _snapshot_time(data, mtime))
+
+    def get(self) -> Optional[CurrentSnapshot]:
+        """Return the cached snapshot, revalidating against disk if due."""
+        if time.monotonic() < self._next_check:
+            return self._snapshot
+        with self._lock:
+            path = self._path()
+            key = self._stat_key_for(path)
+            if key != self._stat_key:
+                if key is None:
+                    logger.warning("current.json not found, returning empty dict")
+                    self._snapshot = None
+                else:
+                    with open(path, 'rb') as f:
+                        raw = f.read()
+                    self._snapshot = self._build(json_codec.loads(raw), key[1] / 1e9)
+                self._stat_key = key
+            self._next_check = time.monotonic() + self.revalidate_interval
+            return self._snapshot
+
+    def push(self, data: Dict[str, Any]) -> CurrentSnapshot:
+        """Install freshly written state without re-reading the file."""
+        snapshot = self._build(data, time.time())
+        with self._lock:
+            # Round-trip through JSON so readers see the same types as after a reload.
+            self._snapshot = snapshot._replace(data=json_codec.loads(snapshot.body))
+            self._stat_key = self._stat_key_for(self._path())
+            self._next_check = time.monotonic() + self.revalidate_interval
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next read to revalidate against disk."""
+        with self._lock:
+            self._stat_key = ()
+            self._next_check = 0.0
+
+
+_current_cache = CurrentStateCache()
+
+# Called with the new CurrentSnapshot after every write_current in this process
+_current_listeners: List[Callable[[CurrentSnapshot], None]] = []
+
+def add_current_listener(callback: Callable[[CurrentSnapshot], None]) -> None:
+    """Register a callback for current-state writes (e.g. the stream hub)."""
+    if callback not in _current_listeners:
+        _current_listeners.append(callback)
+
+def remove_current_listener(callback: Callable[[CurrentSnapshot], None]) -> None:
+    if callback in _current_listeners:
+        _current_listeners.remove(callback)
+
 def ensure_data_dir():
     """Create data directory if it doesn't exist."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+def get_current_snapshot() -> Optional[CurrentSnapshot]:
+    """Cached current state with response bytes and ETag (None if no state yet)."""
+    return _current_cache.get()
+
 def read_current() -> Dict[str, Any]:
-    """Read the current clock state from current.json."""
-    current_path = DATA_DIR / "current.json"
-    if not current_path.exists():
-        logger.warning("current.json not found, returning empty dict")
-        return {}
-    
-    with open(current_path, 'r') as f:
-        return json.load(f)
+    """Read the current clock state (served from the in-memory cache)."""
+    snapshot = _current_cache.get()
+    return dict(snapshot.data) if snapshot is not None else {}
 
 def write_current(data: Dict[str, Any]) -> None:
-    """Write the current clock state to current.json."""
+    """Atomically write the current clock state to current.json."""
     ensure_data_dir()
-    current_path = DATA_DIR / "current.json"
-    with open(current_path, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+    atomic_write_bytes(DATA_DIR / "current.json", json_codec.dumps_file(data))
+    snapshot = _current_cache.push(data)
     logger.info(f"Updated current.json")
+    for callback in list(_current_listeners):
+        try:
+            callback(snapshot)
+        except Exception as e:
+            logger.warning(f"Current-state listener failed: {e}")
+
+def _migrate_legacy_history(store: HistoryStore) -> None:
+    """Import a pre-segmented history.json into the store, once."""
+    legacy_path = DATA_DIR / "history.json"
+    if not legacy_path.exists() or len(store) > 0:
+        return
+    with open(legacy_path, 'rb') as f:
+        entries = json_codec.loads(f.read())
+    store.extend(entries)
+    legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+    logger.info(f"Migrated {len(entries)} entries from history.json to {HISTORY_DIR}")
 
-def read_history() -> list:
-    """Read historical data from history.json."""
-    history_path = DATA_DIR / "history.json"
-    if not history_path.exists():
-        return []
-    
-    with open(history_path, 'r') as f:
-        return json.load(f)
+def get_history_store() -> HistoryStore:
+    """Lazy creation of the history store."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(
+            HISTORY_DIR,
+            segment_max_entries=HISTORY_SEGMENT_ENTRIES,
+            max_segments=HISTORY_MAX_SEGMENTS,
+        )
+        _migrate_legacy_history(_history_store)
+    return _history_store
+
+def iter_history(start: TimestampLike = None, end: TimestampLike = None) -> Iterator[Dict[str, Any]]:
+    """Stream history entries in [start, end], oldest first."""
+    return get_history_store().iter_range(start, end)
+
+def read_history(start: TimestampLike = None, end: TimestampLike = None) -> list:
+    """Read historical entries, optionally limited to a time range."""
+    return list(iter_history(start, end))
 
 def append_to_history(entry: Dict[str, Any]) -> None:
-    """Append an entry to history.json."""
-    ensure_data_dir()
-    history_path = DATA_DIR / "history.json"
-    
-    history = read_history()
-    history.append(entry)
-    
-    # Keep last 1000 entries max
-    if len(history) > 1000:
-        history = history[-1000:]
-    
-    with open(history_path, 'w') as f:
-        json.dump(history, f, indent=2, default=str)
-    logger.info(f"Appended to history.json (total: {len(history)})")
\ No newline at end of file
+    """Append an entry to the history log (O(1), fsync'd)."""
+    store = get_history_store()
+    store.append(entry)
+    logger.info(f"Appended to history (total: {len(store)})")
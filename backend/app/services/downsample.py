@@ -0,0 +1,52 @@
+"""Server-side downsampling of time series for charts.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) keeps the points that
+preserve the visual shape of a line: the first and last points are kept,
+the rest are split into equal buckets and from each bucket the point forming
+the largest triangle with the previously kept point and the next bucket's
+mean is chosen.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """Indices of at most ``threshold`` points of (x, y) chosen by LTTB.
+
+    ``x`` must be increasing. NaN values in ``y`` are skipped (they are gaps,
+    not points); with ``threshold`` >= the number of valid points all of
+    them are returned.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = valid.size
+    if threshold >= n or n <= 2:
+        return valid
+    if threshold < 3:
+        return valid[[0, -1]][:max(threshold, 0)]
+
+    xs, ys = x[valid], y[valid]
+    # Bucket boundaries over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < threshold - 1:
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = xs[next_lo:next_hi].mean(), ys[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        # Twice the triangle area; the constant factor doesn't change argmax
+        area = np.abs(
+            (xs[prev] - avg_x) * (ys[lo:hi] - ys[prev])
+            - (xs[prev] - xs[lo:hi]) * (avg_y - ys[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return valid[selected]
@@ -0,0 +1,326 @@
+"""Incremental harvester for daily arXiv submission counts.
+
+Papers feed the composite only as a daily count, so nothing per-paper is
+kept: the arXiv API is paged through one date window at a time and reduced
+to ``{day: {"total": n, "cs.AI": n, ...}}`` plus monthly roll-ups, stored
+in ``arxiv_counts.json`` together with the high-water mark. Each run only
+fetches the days after that mark (re-fetching the last few, whose counts
+still grow while submissions are announced).
+
+Pages of a window are fetched concurrently, but every request goes through
+one rate limiter so the harvester stays within arXiv's API terms. The API
+URL, start date, request interval and per-run window cap are the
+``arxiv_*`` settings; point ``ARXIV_API_URL`` at a local server to run it
+against a fake API.
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ...config import get_settings
+from ..atomic_io import atomic_write_json
+from ..data_store import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+ARXIV_CATEGORIES = ('cs.AI', 'cs.LG', 'cs.CL')
+
+COUNTS_PATH = DATA_DIR / "arxiv_counts.json"
+
+MAX_CONCURRENT_REQUESTS = 3
+PAGE_SIZE = 1000
+# Deep offsets are unreliable; windows with more results are split in half
+MAX_WINDOW_RESULTS = 10000
+WINDOW_DAYS = 7
+# Recent days are re-harvested because late announcements keep adding to them
+SETTLE_DAYS = 3
+# The API occasionally returns an empty page mid-listing; retry those
+EMPTY_PAGE_RETRIES = 3
+
+HTTP_TIMEOUT = (10, 120)
+USER_AGENT = 'singularity-clock/0.1 (arXiv submission counts)'
+
+NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'opensearch': 'http://a9.com/-/spec/opensearch/1.1/',
+}
+
+VERSION_SUFFIX = re.compile(r'v\d+$')
+
+DailyCounts = Dict[str, Dict[str, int]]
+
+
+class RateLimiter:
+    """Spaces request starts at least ``interval`` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.calls = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_session() -> requests.Session:
+    """HTTP session with retries on throttling and server errors."""
+    retry = Retry(
+        total=4,
+        backoff_factor=3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def build_query(categories: Sequence[str], start: date, end: date) -> str:
+    """search_query for papers in any of ``categories`` submitted in [start, end]."""
+    cats = ' OR '.join(f"cat:{cat}" for cat in categories)
+    return f"({cats}) AND submittedDate:[{start:%Y%m%d}0000 TO {end:%Y%m%d}2359]"
+
+
+def parse_feed(content: bytes) -> Tuple[int, List[Tuple[str, str, Set[str]]]]:
+    """Return (totalResults, [(paper id, submission day, categories), ...])."""
+    root = ET.fromstring(content)
+    total_text = root.findtext('opensearch:totalResults', default='0', namespaces=NAMESPACES)
+    entries = []
+    for entry in root.iterfind('atom:entry', NAMESPACES):
+        paper_id = entry.findtext('atom:id', default='', namespaces=NAMESPACES).strip()
+        published = entry.findtext('atom:published', default='', namespaces=NAMESPACES).strip()
+        if not paper_id or len(published) < 10:
+            continue
+        # Drop the version suffix so v1/v2 of a paper count once
+        paper_id = VERSION_SUFFIX.sub('', paper_id.rsplit('/abs/', 1)[-1])
+        categories = {c.get('term') for c in entry.iterfind('atom:category', NAMESPACES) if c.get('term')}
+        entries.append((paper_id, published[:10], categories))
+    return int(total_text or 0), entries
+
+
+def _date_range(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _windows(start: date, end: date, days: int) -> Iterator[Tuple[date, date]]:
+    while start <= end:
+        window_end = min(start + timedelta(days=days - 1), end)
+        yield start, window_end
+        start = window_end + timedelta(days=1)
+
+
+class ArxivHarvester:
+    """Fetches and aggregates arXiv listings for a set of categories."""
+
+    def __init__(
+        self,
+        categories: Sequence[str] = ARXIV_CATEGORIES,
+        api_url: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        min_interval: Optional[float] = None,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        page_size: int = PAGE_SIZE,
+        max_window_results: int = MAX_WINDOW_RESULTS,
+    ):
+        settings = get_settings()
+        self.categories = sorted(categories)
+        self.api_url = api_url or settings.arxiv_api_url
+        self.session = session or make_session()
+        self.limiter = RateLimiter(settings.arxiv_min_request_interval if min_interval is None else min_interval)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.max_window_results = max_window_results
+
+    @property
+    def requests_made(self) -> int:
+        return self.limiter.calls
+
+    def fetch_page(self, start: date, end: date, offset: int) -> Tuple[int, List[Tuple[str, str, Set[str]]]]:
+        params = {
+            'search_query': build_query(self.categories, start, end),
+            'start': offset,
+            'max_results': self.page_size,
+            'sortBy': 'submittedDate',
+            'sortOrder': 'ascending',
+        }
+        for attempt in range(EMPTY_PAGE_RETRIES + 1):
+            self.limiter.wait()
+            response = self.session.get(self.api_url, params=params, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            total, entries = parse_feed(response.content)
+            if entries or offset >= total:
+                return total, entries
+            logger.warning(f"Empty arXiv page at offset {offset} for {start}..{end}, retrying ({attempt + 1})")
+        raise RuntimeError(f"arXiv returned no entries at offset {offset} of {total} for {start}..{end}")
+
+    def harvest_window(self, start: date, end: date) -> DailyCounts:
+        """Daily counts for [start, end]; days without papers are recorded as 0."""
+        total, first_page = self.fetch_page(start, end, 0)
+        if total > self.max_window_results and start < end:
+            middle = start + (end - start) // 2
+            logger.info(f"{start}..{end} has {total} results, splitting window")
+            counts = self.harvest_window(start, middle)
+            counts.update(self.harvest_window(middle + timedelta(days=1), end))
+            return counts
+        if total > self.max_window_results:
+            logger.warning(f"{start} alone has {total} results; counts past offset "
+                           f"{self.max_window_results} may be incomplete")
+
+        entries = list(first_page)
+        offsets = range(len(first_page), min(total, self.max_window_results), self.page_size)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for _, page in pool.map(lambda offset: self.fetch_page(start, end, offset), offsets):
+                    entries.extend(page)
+
+        return self.aggregate(entries, start, end)
+
+    def aggregate(self, entries: List[Tuple[str, str, Set[str]]], start: date, end: date) -> DailyCounts:
+        """Reduce entries to unique-paper counts per day, overall and per category."""
+        seen: Set[str] = set()
+        per_day: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for paper_id, day, categories in entries:
+            if paper_id in seen:
+                continue
+            seen.add(paper_id)
+            counts = per_day[day]
+            counts['total'] += 1
+            for category in categories.intersection(self.categories):
+                counts[category] += 1
+
+        result: DailyCounts = {}
+        for day in _date_range(start, end):
+            key = day.isoformat()
+            counts = per_day.get(key, {})
+            result[key] = {'total': counts.get('total', 0), **{c: counts.get(c, 0) for c in self.categories}}
+        return result
+
+
+def monthly_rollup(daily: DailyCounts) -> DailyCounts:
+    """Sum daily counts into ``YYYY-MM`` buckets."""
+    months: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for day, counts in daily.items():
+        bucket = months[day[:7]]
+        for key, value in counts.items():
+            bucket[key] += value
+    return {month: dict(counts) for month, counts in sorted(months.items())}
+
+
+def load_counts(path: Path = COUNTS_PATH) -> Dict[str, Any]:
+    """Stored counts and high-water mark, or an empty store."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logger.warning(f"Ignoring unreadable {path.name}; harvesting from scratch")
+        return {}
+
+
+def save_counts(daily: DailyCounts, categories: Sequence[str], harvested_through: date,
+                path: Path = COUNTS_PATH) -> None:
+    daily = dict(sorted(daily.items()))
+    atomic_write_json(path, {
+        'categories': sorted(categories),
+        'harvested_through': harvested_through.isoformat(),
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+        'daily': daily,
+        'monthly': monthly_rollup(daily),
+    })
+
+
+def harvest(
+    until: Optional[date] = None,
+    start_date: Optional[date] = None,
+    harvester: Optional[ArxivHarvester] = None,
+    path: Path = COUNTS_PATH,
+    window_days: int = WINDOW_DAYS,
+    settle_days: int = SETTLE_DAYS,
+    max_windows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Fetch counts for the days after the stored high-water mark.
+
+    ``until`` defaults to yesterday (UTC) and ``start_date`` to the
+    ``arxiv_start_date`` setting. At most ``max_windows`` windows are fetched
+    (0 for no cap, default ``arxiv_max_windows_per_run``): the first backfill
+    takes about an hour at the request interval, so it is spread over several
+    refresh runs instead of holding the refresh lock. Counts are saved after
+    every window, so an interrupted backfill resumes where it stopped.
+    """
+    settings = get_settings()
+    start_date = start_date or settings.arxiv_start_date
+    max_windows = settings.arxiv_max_windows_per_run if max_windows is None else max_windows
+    harvester = harvester or ArxivHarvester()
+    until = until or (datetime.now(timezone.utc).date() - timedelta(days=1))
+
+    stored = load_counts(path)
+    daily: DailyCounts = stored.get('daily', {})
+    mark = stored.get('harvested_through')
+    if stored and stored.get('categories') != harvester.categories:
+        logger.info(f"arXiv categories changed to {harvester.categories}; harvesting from scratch")
+        daily, mark = {}, None
+
+    start = start_date
+    if mark:
+        start = max(start_date, date.fromisoformat(mark) + timedelta(days=1) - timedelta(days=settle_days))
+    if start > until:
+        logger.info(f"arXiv counts already harvested through {mark}")
+        return {'mode': 'noop', 'harvested_through': mark, 'days': 0, 'requests': 0}
+
+    logger.info(f"Harvesting arXiv counts for {harvester.categories} from {start} to {until}")
+    days = 0
+    harvested_through = None
+    for i, (window_start, window_end) in enumerate(_windows(start, until, window_days)):
+        if max_windows and i == max_windows:
+            logger.info(f"arXiv backfill capped at {max_windows} windows; continuing from "
+                        f"{window_start} next run")
+            break
+        window = harvester.harvest_window(window_start, window_end)
+        daily.update(window)
+        days += len(window)
+        harvested_through = window_end
+        save_counts(daily, harvester.categories, window_end, path)
+        logger.info(f"arXiv {window_start}..{window_end}: {sum(c['total'] for c in window.values())} papers")
+
+    return {
+        'mode': 'incremental' if mark else 'full',
+        'start': start.isoformat(),
+        'harvested_through': harvested_through.isoformat(),
+        'complete': harvested_through >= until,
+        'days': days,
+        'requests': harvester.requests_made,
+    }
+
+
+def load_paper_counts(path: Path = COUNTS_PATH, category: str = 'total') -> Dict[date, float]:
+    """Daily counts keyed by date, in the shape the composite pipeline takes."""
+    daily = load_counts(path).get('daily', {})
+    return {date.fromisoformat(day): float(counts.get(category, 0)) for day, counts in daily.items()}
@@ -0,0 +1,324 @@
+"""Bulk loader for Epoch AI CSV exports into PostgreSQL.
+
+Rows are COPYed into temporary staging tables with asyncpg's
+``copy_records_to_table`` and merged with a few set-based statements, all
+in one transaction:
+
+* organizations are inserted in bulk and resolved to ids by a join,
+* models are upserted with ``INSERT ... ON CONFLICT (model_name) DO UPDATE``
+  (unchanged rows are left alone so ``updated_at`` only moves on real edits),
+* benchmark scores are melted from the wide export, new or changed
+  (model, benchmark, date) scores are written and identical ones skipped.
+"""
+
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+import numpy as np
+import pandas as pd
+
+from ...config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Epoch models CSV column -> staging column
+MODEL_COLUMNS = {
+    'Model': 'model_name',
+    'Model name': 'model_name',
+    'Organization': 'organization',
+    'Country (of organization)': 'country',
+    'Publication date': 'publication_date',
+    'Publication Date': 'publication_date',
+    'Domain': 'domain',
+    'Training compute (FLOP)': 'training_compute_flop',
+    'Training Compute (FLOP)': 'training_compute_flop',
+    'Compute (FLOP)': 'training_compute_flop',
+    'Parameters': 'parameters',
+    'Training dataset size (datapoints)': 'training_dataset_size',
+    'Training hardware': 'hardware_used',
+    'Confidence': 'confidence',
+    'Citations': 'citation_count',
+    'Notability criteria': 'notability_criteria',
+    'Link': 'link',
+}
+
+# Staging column -> SQL type; order is the COPY column order
+MODEL_STAGING_COLUMNS = {
+    'model_name': 'text',
+    'organization': 'text',
+    'country': 'text[]',
+    'publication_date': 'date',
+    'domain': 'text[]',
+    'training_compute_flop': 'numeric',
+    'parameters': 'numeric',
+    'training_dataset_size': 'numeric',
+    'hardware_used': 'text[]',
+    'confidence': 'text',
+    'citation_count': 'integer',
+    'notability_criteria': 'text[]',
+    'link': 'text',
+}
+
+# Columns of the models table refreshed on upsert
+MODEL_UPDATE_COLUMNS = [
+    'organization_id', 'publication_date', 'domain', 'training_compute_flop', 'parameters',
+    'training_dataset_size', 'hardware_used', 'confidence', 'citation_count',
+    'notability_criteria', 'link',
+]
+
+SCORE_STAGING_COLUMNS = {
+    'model_name': 'text',
+    'benchmark_name': 'text',
+    'score': 'double precision',
+    'score_date': 'date',
+}
+
+# Candidate names for the model and date columns of the benchmarks export
+BENCHMARK_MODEL_COLUMNS = ('Model', 'model', 'Model version', 'model_name')
+BENCHMARK_DATE_COLUMNS = ('date', 'Date', 'Release date')
+
+
+def _command_count(status: str) -> int:
+    """Row count from an asyncpg command status such as 'INSERT 0 42'."""
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (ValueError, AttributeError):
+        return 0
+
+
+def _text(series: pd.Series) -> List[Optional[str]]:
+    values = series.astype('string').str.strip()
+    return [None if pd.isna(v) or v == '' else str(v) for v in values]
+
+
+def _text_list(series: pd.Series) -> List[Optional[List[str]]]:
+    """Split Epoch's comma-separated multi-value cells into arrays."""
+    result = []
+    for value in _text(series):
+        if value is None:
+            result.append(None)
+        else:
+            items = [item.strip() for item in value.split(',') if item.strip()]
+            result.append(items or None)
+    return result
+
+
+def _numbers(series: pd.Series, as_int: bool = False) -> list:
+    """Numeric cells as int or Decimal (for NUMERIC columns); junk becomes None."""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    # Decimal(repr(v)) keeps 1e+23 as 1E+23 rather than its binary expansion
+    return [None if np.isnan(v) else (int(v) if as_int else Decimal(repr(float(v)))) for v in values]
+
+
+def _dates(series: pd.Series) -> list:
+    values = pd.to_datetime(series, errors='coerce')
+    return [None if pd.isna(v) else v.date() for v in values]
+
+
+def model_records(df: pd.DataFrame) -> List[Tuple]:
+    """Convert a raw Epoch models frame into staging records (MODEL_STAGING_COLUMNS order)."""
+    renamed = df.rename(columns={c: n for c, n in MODEL_COLUMNS.items() if c in df.columns})
+    renamed = renamed.loc[:, ~renamed.columns.duplicated()]
+    n = len(renamed)
+
+    def column(name: str) -> pd.Series:
+        return renamed[name] if name in renamed.columns else pd.Series([None] * n, dtype='object')
+
+    organizations = _text_list(column('organization'))
+    columns = {
+        'model_name': _text(column('model_name')),
+        # A model has one organization_id; the first listed organization wins
+        'organization': [orgs[0] if orgs else None for orgs in organizations],
+        'country': _text_list(column('country')),
+        'publication_date': _dates(column('publication_date')),
+        'domain': _text_list(column('domain')),
+        'training_compute_flop': _numbers(column('training_compute_flop')),
+        'parameters': _numbers(column('parameters')),
+        'training_dataset_size': _numbers(column('training_dataset_size')),
+        'hardware_used': _text_list(column('hardware_used')),
+        'confidence': _text(column('confidence')),
+        'citation_count': _numbers(column('citation_count'), as_int=True),
+        'notability_criteria': _text_list(column('notability_criteria')),
+        'link': _text(column('link')),
+    }
+    return list(zip(*(columns[name] for name in MODEL_STAGING_COLUMNS)))
+
+
+def score_records(df: pd.DataFrame, benchmark_columns: Optional[Sequence[str]] = None) -> List[Tuple]:
+    """Melt a wide benchmarks frame into (model_name, benchmark_name, score, score_date) records.
+
+    ``benchmark_columns`` defaults to every column other than the model and
+    date columns; cells that are not numeric are dropped.
+    """
+    model_col = next((c for c in BENCHMARK_MODEL_COLUMNS if c in df.columns), None)
+    if model_col is None:
+        raise ValueError(f"No model column found in benchmarks data (looked for {BENCHMARK_MODEL_COLUMNS})")
+    date_col = next((c for c in BENCHMARK_DATE_COLUMNS if c in df.columns), None)
+    if benchmark_columns is None:
+        benchmark_columns = [c for c in df.columns if c not in (model_col, date_col)]
+
+    keep = [model_col] + ([date_col] if date_col else []) + list(benchmark_columns)
+    long = df[keep].melt(
+        id_vars=[model_col] + ([date_col] if date_col else []),
+        value_vars=list(benchmark_columns),
+        var_name='benchmark_name',
+        value_name='score',
+    )
+    long['score'] = pd.to_numeric(long['score'], errors='coerce')
+    long = long.dropna(subset=['score', model_col])
+    return list(zip(
+        _text(long[model_col]),
+        long['benchmark_name'].astype(str).tolist(),
+        long['score'].astype(float).tolist(),
+        _dates(long[date_col]) if date_col else [None] * len(long),
+    ))
+
+
+async def _create_staging(conn: asyncpg.Connection, name: str, columns: Dict[str, str]) -> None:
+    definition = ', '.join(f"{col} {sql_type}" for col, sql_type in columns.items())
+    await conn.execute(f"CREATE TEMP TABLE {name} ({definition}) ON COMMIT DROP")
+
+
+async def load_models(conn: asyncpg.Connection, df: pd.DataFrame) -> Dict[str, int]:
+    """COPY models into staging and merge them into organizations/models.
+
+    Must run inside a transaction (the staging table is dropped on commit).
+    """
+    records = model_records(df)
+    await _create_staging(conn, 'models_staging', MODEL_STAGING_COLUMNS)
+    await conn.copy_records_to_table('models_staging', records=records, columns=list(MODEL_STAGING_COLUMNS))
+
+    orgs_status = await conn.execute("""
+        INSERT INTO organizations (name, country)
+        SELECT DISTINCT ON (organization) organization, country
+        FROM models_staging
+        WHERE organization IS NOT NULL
+        ORDER BY organization, country IS NULL
+        ON CONFLICT (name) DO NOTHING
+    """)
+
+    insert_columns = ', '.join(['model_name'] + MODEL_UPDATE_COLUMNS)
+    select_columns = ', '.join(
+        ['s.model_name', 'o.id'] + [f"s.{col}" for col in MODEL_UPDATE_COLUMNS if col != 'organization_id']
+    )
+    assignments = ', '.join(f"{col} = EXCLUDED.{col}" for col in MODEL_UPDATE_COLUMNS)
+    current = ', '.join(f"m.{col}" for col in MODEL_UPDATE_COLUMNS)
+    incoming = ', '.join(f"EXCLUDED.{col}" for col in MODEL_UPDATE_COLUMNS)
+    models_status = await conn.execute(f"""
+        INSERT INTO models AS m ({insert_columns})
+        SELECT DISTINCT ON (s.model_name) {select_columns}
+        FROM models_staging s
+        LEFT JOIN organizations o ON o.name = s.organization
+        WHERE s.model_name IS NOT NULL
+        ORDER BY s.model_name, s.publication_date DESC NULLS LAST
+        ON CONFLICT (model_name) DO UPDATE
+        SET {assignments}, updated_at = now()
+        WHERE ({current}) IS DISTINCT FROM ({incoming})
+    """)
+
+    counts = {
+        'models_staged': len(records),
+        'organizations_inserted': _command_count(orgs_status),
+        'models_upserted': _command_count(models_status),
+    }
+    logger.info(f"Loaded models: {counts}")
+    return counts
+
+
+async def load_benchmark_scores(
+    conn: asyncpg.Connection,
+    df: pd.DataFrame,
+    benchmark_columns: Optional[Sequence[str]] = None,
+) -> Dict[str, int]:
+    """COPY melted benchmark scores into staging and merge them.
+
+    Scores for models that are not in the models table are skipped. A
+    changed score replaces the old row so its ``created_at`` reflects the
+    revision. Must run inside a transaction.
+    """
+    records = score_records(df, benchmark_columns)
+    await _create_staging(conn, 'scores_staging', SCORE_STAGING_COLUMNS)
+    await conn.copy_records_to_table('scores_staging', records=records, columns=list(SCORE_STAGING_COLUMNS))
+
+    benchmarks_status = await conn.execute("""
+        INSERT INTO benchmarks (benchmark_name)
+        SELECT DISTINCT benchmark_name FROM scores_staging
+        ON CONFLICT (benchmark_name) DO NOTHING
+    """)
+
+    # Resolve ids once; keep the best score per (model, benchmark, date)
+    await conn.execute("""
+        CREATE TEMP TABLE scores_resolved ON COMMIT DROP AS
+        SELECT DISTINCT ON (m.id, b.id, s.score_date)
+               m.id AS model_id, b.id AS benchmark_id, s.score, s.score_date
+        FROM scores_staging s
+        JOIN models m ON m.model_name = s.model_name
+        JOIN benchmarks b ON b.benchmark_name = s.benchmark_name
+        ORDER BY m.id, b.id, s.score_date, s.score DESC
+    """)
+    unmatched = await conn.fetchval("""
+        SELECT count(*) FROM scores_staging s
+        WHERE NOT EXISTS (SELECT 1 FROM models m WHERE m.model_name = s.model_name)
+    """)
+
+    deleted_status = await conn.execute("""
+        DELETE FROM model_benchmark_scores t
+        USING scores_resolved r
+        WHERE t.model_id = r.model_id
+          AND t.benchmark_id = r.benchmark_id
+          AND t.score_date IS NOT DISTINCT FROM r.score_date
+          AND t.score IS DISTINCT FROM r.score
+    """)
+    inserted_status = await conn.execute("""
+        INSERT INTO model_benchmark_scores (model_id, benchmark_id, score, score_date)
+        SELECT r.model_id, r.benchmark_id, r.score, r.score_date
+        FROM scores_resolved r
+        WHERE NOT EXISTS (
+            SELECT 1 FROM model_benchmark_scores t
+            WHERE t.model_id = r.model_id
+              AND t.benchmark_id = r.benchmark_id
+              AND t.score_date IS NOT DISTINCT FROM r.score_date
+        )
+    """)
+
+    counts = {
+        'scores_staged': len(records),
+        'scores_unmatched_model': int(unmatched or 0),
+        'benchmarks_inserted': _command_count(benchmarks_status),
+        'scores_replaced': _command_count(deleted_status),
+        'scores_inserted': _command_count(inserted_status),
+    }
+    logger.info(f"Loaded benchmark scores: {counts}")
+    return counts
+
+
+async def load_epoch_frames(
+    models_df: Optional[pd.DataFrame] = None,
+    benchmarks_df: Optional[pd.DataFrame] = None,
+    benchmark_columns: Optional[Sequence[str]] = None,
+    dsn: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Load Epoch models and/or benchmark scores in a single transaction."""
+    conn = await asyncpg.connect(dsn or get_settings().database_url)
+    try:
+        counts: Dict[str, Any] = {}
+        async with conn.transaction():
+            if models_df is not None:
+                counts.update(await load_models(conn, models_df))
+            if benchmarks_df is not None:
+                counts.update(await load_benchmark_scores(conn, benchmarks_df, benchmark_columns))
+        return counts
+    finally:
+        await conn.close()
+
+
+def run_epoch_load(
+    models_df: Optional[pd.DataFrame] = None,
+    benchmarks_df: Optional[pd.DataFrame] = None,
+    benchmark_columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Synchronous wrapper for scripts."""
+    return asyncio.run(load_epoch_frames(models_df, benchmarks_df, benchmark_columns))
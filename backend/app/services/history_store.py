@@ -0,0 +1,339 @@
+"""Append-only, segmented JSON-lines store for clock history.
+
+Entries are appended one line at a time to the newest segment file
+(``segment-000001.jsonl``, ``segment-000002.jsonl``, ...). When a segment
+reaches ``segment_max_entries`` a new one is started, and the oldest
+segments are deleted once more than ``max_segments`` exist. Each segment's
+first/last timestamps are kept in memory so time-range reads only open the
+segments that can contain matching entries.
+"""
+
+import os
+import threading
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Union
+
+from . import json_codec
+from .atomic_io import fsync_directory
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+DEFAULT_SEGMENT_MAX_ENTRIES = 1000
+DEFAULT_MAX_SEGMENTS = 10
+DEFAULT_TAIL_SIZE = 1000
+
+TimestampLike = Union[datetime, str, None]
+
+
+def parse_timestamp(value: TimestampLike) -> Optional[datetime]:
+    """Parse an entry timestamp into a naive UTC datetime (None if unparseable)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+class _Segment:
+    """In-memory index entry for one segment file."""
+
+    __slots__ = ("number", "path", "count", "size", "first_ts", "last_ts")
+
+    def __init__(self, number: int, path: Path):
+        self.number = number
+        self.path = path
+        self.count = 0
+        self.size = 0
+        self.first_ts: Optional[datetime] = None
+        self.last_ts: Optional[datetime] = None
+
+    def note(self, ts: Optional[datetime]) -> None:
+        if ts is None:
+            return
+        if self.first_ts is None or ts < self.first_ts:
+            self.first_ts = ts
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+
+    def overlaps(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        if self.first_ts is None or self.last_ts is None:
+            return True
+        if start is not None and self.last_ts < start:
+            return False
+        if end is not None and self.first_ts > end:
+            return False
+        return True
+
+
+class HistoryStore:
+    """Segmented append-only history log with an in-memory tail."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_max_entries: int = DEFAULT_SEGMENT_MAX_ENTRIES,
+        max_segments: Optional[int] = DEFAULT_MAX_SEGMENTS,
+        tail_size: int = DEFAULT_TAIL_SIZE,
+        fsync: bool = True,
+    ):
+        if segment_max_entries < 1:
+            raise ValueError("segment_max_entries must be at least 1")
+        self.directory = Path(directory)
+        self.segment_max_entries = segment_max_entries
+        self.max_segments = max_segments
+        self.fsync = fsync
+        self._tail: deque = deque(maxlen=tail_size)
+        self._segments: List[_Segment] = []
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Loading / index maintenance
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+    def _list_segment_numbers(self) -> List[int]:
+        if not self.directory.exists():
+            return []
+        numbers = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            stem = path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            if stem.isdigit():
+                numbers.append(int(stem))
+        return sorted(numbers)
+
+    def _repair_torn_tail(self, path: Path) -> None:
+        """Drop a partially written last line left behind by a crash."""
+        with open(path, "rb+") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            new_size = data.rfind(b"\n") + 1
+            f.truncate(new_size)
+        logger.warning(f"Truncated torn history entry in {path.name} ({len(data) - new_size} bytes)")
+
+    def _index_segment(self, segment: _Segment, collect_tail: bool, start: int = 0) -> List[Dict[str, Any]]:
+        """Index the complete lines of a segment from byte ``start`` on."""
+        entries = []
+        with open(segment.path, "rb") as f:
+            f.seek(start)
+            size = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Still being written by another process; read next time
+                    break
+                size += len(line)
+                entry = self._decode(line)
+                if entry is None:
+                    continue
+                segment.count += 1
+                segment.note(parse_timestamp(entry.get("timestamp")))
+                if collect_tail:
+                    entries.append(entry)
+            segment.size = size
+        return entries
+
+    def _load(self) -> None:
+        self._segments = []
+        self._tail.clear()
+        numbers = self._list_segment_numbers()
+        if numbers:
+            self._repair_torn_tail(self._segment_path(numbers[-1]))
+
+        tail_needed = self._tail.maxlen or 0
+        tail_chunks: List[List[Dict[str, Any]]] = []
+        for number in reversed(numbers):
+            segment = _Segment(number, self._segment_path(number))
+            entries = self._index_segment(segment, collect_tail=tail_needed > 0)
+            if tail_needed > 0:
+                tail_chunks.append(entries[-tail_needed:])
+                tail_needed -= len(tail_chunks[-1])
+            self._segments.insert(0, segment)
+
+        for chunk in reversed(tail_chunks):
+            self._tail.extend(chunk)
+        self._loaded = True
+
+    def _refresh(self) -> None:
+        """Load the index, or catch up with what another process appended."""
+        if not self._loaded:
+            self._load()
+            return
+        active = self._segments[-1] if self._segments else None
+        if active is None:
+            if self._list_segment_numbers():
+                self._load()
+            return
+        try:
+            size = active.path.stat().st_size
+        except FileNotFoundError:
+            self._load()
+            return
+        rotated = self._segment_path(active.number + 1).exists()
+        if size < active.size:
+            # Truncated or replaced under us: the index no longer applies
+            self._load()
+        elif size > active.size or rotated:
+            self._catch_up(active)
+
+    def _catch_up(self, active: _Segment) -> None:
+        """Index the entries appended after ``active``'s indexed size.
+
+        Segments are append-only, so only the new bytes of the active segment
+        and any segments started since are read; segments another process
+        dropped by retention are forgotten.
+        """
+        collect_tail = bool(self._tail.maxlen)
+        self._tail.extend(self._index_segment(active, collect_tail, start=active.size))
+        numbers = self._list_segment_numbers()
+        for number in numbers:
+            if number > active.number:
+                segment = _Segment(number, self._segment_path(number))
+                self._tail.extend(self._index_segment(segment, collect_tail))
+                self._segments.append(segment)
+        present = set(numbers)
+        self._segments = [segment for segment in self._segments if segment.number in present]
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json_codec.loads(line)
+        except ValueError:
+            logger.warning("Skipping undecodable history entry")
+            return None
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> bytes:
+        return json_codec.dumps(entry) + b"\n"
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _rotate(self) -> _Segment:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        number = self._segments[-1].number + 1 if self._segments else 1
+        segment = _Segment(number, self._segment_path(number))
+        segment.path.touch()
+        if self.fsync:
+            fsync_directory(self.directory)
+        self._segments.append(segment)
+        self._apply_retention()
+        return segment
+
+    def _apply_retention(self) -> None:
+        if self.max_segments is None:
+            return
+        while len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            try:
+                oldest.path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"Dropped history segment {oldest.path.name} ({oldest.count} entries)")
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Durably append one entry; O(1) regardless of history length."""
+        self.extend([entry])
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """Durably append several entries, rotating segments as needed."""
+        with self._lock:
+            self._refresh()
+            pending = list(entries)
+            while pending:
+                active = self._segments[-1] if self._segments else None
+                if active is None or active.count >= self.segment_max_entries:
+                    active = self._rotate()
+                room = self.segment_max_entries - active.count
+                batch, pending = pending[:room], pending[room:]
+                payload = b"".join(self._encode(entry) for entry in batch)
+                with open(active.path, "ab") as f:
+                    f.write(payload)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                active.size += len(payload)
+                active.count += len(batch)
+                for entry in batch:
+                    active.note(parse_timestamp(entry.get("timestamp")))
+                self._tail.extend(batch)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return sum(segment.count for segment in self._segments)
+
+    def tail(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the most recent ``n`` entries (all cached ones if None) from memory."""
+        with self._lock:
+            self._refresh()
+            entries = list(self._tail)
+        return entries if n is None else entries[-n:] if n > 0 else []
+
+    def latest_timestamp(self) -> Optional[datetime]:
+        """Timestamp of the newest entry, from the in-memory index."""
+        with self._lock:
+            self._refresh()
+            stamps = [s.last_ts for s in self._segments if s.last_ts is not None]
+        return max(stamps) if stamps else None
+
+    def iter_range(self, start: TimestampLike = None, end: TimestampLike = None) -> Iterator[Dict[str, Any]]:
+        """Stream entries whose timestamp lies in [start, end], oldest first.
+
+        With no bounds every entry is yielded, including ones without a
+        parseable timestamp. Segments outside the range are never opened.
+        """
+        start_ts, end_ts = parse_timestamp(start), parse_timestamp(end)
+        bounded = start_ts is not None or end_ts is not None
+        with self._lock:
+            self._refresh()
+            segments = [s for s in self._segments if s.overlaps(start_ts, end_ts)]
+            sizes = {s.number: s.size for s in segments}
+
+        for segment in segments:
+            try:
+                f = open(segment.path, "rb")
+            except FileNotFoundError:
+                # Removed by retention while we were reading.
+                continue
+            with f:
+                remaining = sizes[segment.number]
+                for line in f:
+                    remaining -= len(line)
+                    if remaining < 0:
+                        break
+                    entry = self._decode(line)
+                    if entry is None:
+                        continue
+                    if bounded:
+                        ts = parse_timestamp(entry.get("timestamp"))
+                        if ts is None:
+                            continue
+                        if start_ts is not None and ts < start_ts:
+                            continue
+                        if end_ts is not None and ts > end_ts:
+                            continue
+                    yield entry
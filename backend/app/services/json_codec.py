@@ -0,0 +1,62 @@
+"""JSON encoding shared by the API responses and the data store.
+
+By default this is the standard library ``json`` module, producing exactly
+the output the store has always written. Setting ``USE_ORJSON=true``
+switches to orjson (in requirements.txt): several times faster, compact,
+and native for datetimes, dates and NumPy values. Both backends read what
+the other wrote.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_backend: Optional[str] = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def backend() -> str:
+    """Name of the active codec, ``"orjson"`` or ``"json"``."""
+    global _backend
+    if _backend is None:
+        use_orjson = get_settings().use_orjson
+        if use_orjson and orjson is None:
+            logger.warning("USE_ORJSON is set but orjson is not installed; using the json module")
+        _backend = "orjson" if use_orjson and orjson is not None else "json"
+    return _backend
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; unknown types fall back to ``str`` like the store always did."""
+    if backend() == "orjson":
+        return orjson.dumps(obj, default=str, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_file(obj: Any) -> bytes:
+    """Bytes for a JSON file under DATA_DIR.
+
+    The json backend keeps the historical ``indent=2`` layout; orjson writes
+    compact output, which is also what gets served.
+    """
+    if backend() == "orjson":
+        return dumps(obj)
+    return json.dumps(obj, indent=2, default=str).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str; errors are ``ValueError`` subclasses for both backends."""
+    if backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,168 @@
+"""Prometheus-style metrics kept in process memory.
+
+Histograms pre-allocate their bucket counts when a label set is first
+seen, and an observation is a bisect plus two integer increments. All
+recording happens on the event loop, where a coroutine cannot be
+interleaved between those increments, so nothing takes a lock on the
+request path. ``render`` produces the Prometheus text exposition format.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Request latency buckets (seconds): fine-grained below 1 ms, where the
+# cached clock endpoints are expected to sit
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """``{a="1",b="2"}`` with keys sorted, or an empty string."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(str(value))}"' for key, value in sorted(labels.items())) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-on-render histogram over fixed upper bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # One slot per bound plus the +Inf overflow
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """Histograms sharing a name and bounds, one per label-value tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], bounds: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.bounds = tuple(bounds)
+        self.children: Dict[LabelValues, Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = Histogram(self.bounds)
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, hist in sorted(self.children.items()):
+            labels = dict(zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip(hist.bounds + (float("inf"),), hist.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(hist.sum)}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {hist.count}")
+        return lines
+
+
+class CounterFamily:
+    """Monotonic counters, one per label-value tuple."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values: Dict[LabelValues, int] = {}
+
+    def inc(self, *values: str, amount: int = 1) -> None:
+        self.values[values] = self.values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(dict(zip(self.label_names, values)))} {count}")
+        return lines
+
+
+def _family_lines(kind: str, name: str, help_text: str,
+                  samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return lines
+
+
+def gauge_lines(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """A gauge family from (labels, value) pairs; None values are skipped."""
+    return _family_lines("gauge", name, help_text, samples)
+
+
+def counter_lines(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """A counter family from (labels, value) pairs kept elsewhere; ``name`` should end in ``_total``."""
+    return _family_lines("counter", name, help_text, samples)
+
+
+class HttpMetrics:
+    """Everything the metrics middleware and the clock routes record."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.duration = HistogramFamily(
+            "http_request_duration_seconds",
+            "Time from request start to the last response byte, by route template.",
+            ("method", "route", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.response_size = HistogramFamily(
+            "http_response_size_bytes",
+            "Response body size (as sent, after compression), by route template.",
+            ("method", "route"),
+            SIZE_BUCKETS,
+        )
+        self.cache = CounterFamily(
+            "clock_cache_requests_total",
+            "Cache lookups in the clock routes by cache and result (hit or miss).",
+            ("cache", "result"),
+        )
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        self.duration.labels(method, route, str(status)).observe(seconds)
+        self.response_size.labels(method, route).observe(size)
+
+    def cache_result(self, cache: str, hit: bool) -> None:
+        self.cache.inc(cache, "hit" if hit else "miss")
+
+    def render(self) -> List[str]:
+        return [
+            "# HELP http_requests_in_flight Requests currently being served (excluding event streams).",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            *self.duration.render(),
+            *self.response_size.render(),
+            *self.cache.render(),
+        ]
+
+
+http_metrics = HttpMetrics()
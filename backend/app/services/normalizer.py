@@ -1,7 +1,123 @@
 # Min-max scaling and weighting logic
+#
+# Everything here works on whole NumPy arrays so a backfill of years of daily
+# CompositeHistory rows is a handful of vectorized operations, not a loop.
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Composite weights: compute 50%, capabilities 35%, papers 15%
+DEFAULT_WEIGHTS = {"compute": 0.50, "capability": 0.35, "papers": 0.15}
+
+# Input series feeding each component
+COMPONENT_INPUTS = {
+    "compute": "compute_flop",
+    "capability": "benchmark_score",
+    "papers": "paper_count",
+}
+
+# Training compute spans many orders of magnitude, so it is scaled on log10
+LOG_SCALED_COMPONENTS = frozenset({"compute"})
+
+Bounds = Tuple[float, float]
+
+
 def normalize(value, min_val, max_val):
-    return (value - min_val) / (max_val - min_val) * 100
+    """Min-max scale value(s) to 0-100.
+
+    Accepts scalars or arrays. A zero (or NaN) range maps to 0 instead of
+    dividing by zero; NaN inputs stay NaN.
+    """
+    values = np.asarray(value, dtype=float)
+    span = np.asarray(max_val, dtype=float) - np.asarray(min_val, dtype=float)
+    safe_span = np.where(span > 0, span, 1.0)
+    with np.errstate(invalid="ignore"):
+        scaled = np.where(span > 0, (values - min_val) / safe_span * 100, 0.0)
+    scaled = np.where(np.isnan(values), np.nan, scaled)
+    return scaled.item() if scaled.ndim == 0 else scaled
+
+
+def log_scale(values) -> np.ndarray:
+    """log10 of values; non-positive or missing values become NaN."""
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(values > 0, np.log10(np.where(values > 0, values, 1.0)), np.nan)
+
+
+def series_bounds(values) -> Bounds:
+    """(min, max) of a series ignoring NaNs; (nan, nan) if nothing is valid."""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0 or np.isnan(values).all():
+        return (float("nan"), float("nan"))
+    return (float(np.nanmin(values)), float(np.nanmax(values)))
+
+
+def scale_input(component: str, values) -> np.ndarray:
+    """Put raw inputs on the scale their component is normalized in."""
+    if component in LOG_SCALED_COMPONENTS:
+        return log_scale(values)
+    return np.asarray(values, dtype=float)
+
+
+def normalize_series(values, log: bool = False, bounds: Optional[Bounds] = None) -> np.ndarray:
+    """Normalize a whole series to 0-100 against its own or the given bounds.
+
+    ``bounds`` are in the scaled space (log10 FLOP when ``log`` is set);
+    values outside them are clamped to 0-100.
+    """
+    scaled = log_scale(values) if log else np.asarray(values, dtype=float)
+    if bounds is None:
+        return np.atleast_1d(normalize(scaled, *series_bounds(scaled)))
+    return np.clip(np.atleast_1d(normalize(scaled, *bounds)), 0.0, 100.0)
+
+
+def composite(
+    data: Mapping[str, Any],
+    weights: Optional[Mapping[str, float]] = None,
+    bounds: Optional[Mapping[str, Bounds]] = None,
+) -> Dict[str, np.ndarray]:
+    """Compute normalized components and the weighted composite in one pass.
+
+    ``data`` maps the COMPONENT_INPUTS names (``compute_flop``,
+    ``benchmark_score``, ``paper_count``) to equal-length arrays; a missing
+    series counts as all-NaN. ``bounds`` optionally pins the normalization
+    range per component (keyed like DEFAULT_WEIGHTS); values outside a
+    pinned range are clamped. Where a component is NaN, the remaining
+    weights are renormalized so the composite stays on the 0-100 scale;
+    rows with no components at all are NaN.
+
+    Returns arrays keyed like the CompositeHistory columns.
+    """
+    weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+    bounds = bounds or {}
+
+    lengths = {len(np.atleast_1d(data[key])) for key in COMPONENT_INPUTS.values() if key in data}
+    if len(lengths) > 1:
+        raise ValueError(f"Input series have different lengths: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 0
+
+    components = {}
+    for component, key in COMPONENT_INPUTS.items():
+        if key in data:
+            components[component] = normalize_series(
+                data[key],
+                log=component in LOG_SCALED_COMPONENTS,
+                bounds=bounds.get(component),
+            )
+        else:
+            components[component] = np.full(n, np.nan)
+
+    stacked = np.vstack([components[c] for c in COMPONENT_INPUTS]) if n else np.empty((len(COMPONENT_INPUTS), 0))
+    w = np.array([weights.get(c, 0.0) for c in COMPONENT_INPUTS], dtype=float)[:, None]
+    present = ~np.isnan(stacked)
+    weight_total = (w * present).sum(axis=0)
+    weighted_sum = np.where(present, stacked * w, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        composite_value = np.where(weight_total > 0, weighted_sum / np.where(weight_total > 0, weight_total, 1.0), np.nan)
 
-def composite(data):
-    # TODO: apply weights 50/35/15
-    pass
+    return {
+        "compute_component": components["compute"],
+        "capability_component": components["capability"],
+        "papers_component": components["papers"],
+        "composite_value": composite_value,
+    }
@@ -0,0 +1,238 @@
+"""Per-stage instrumentation for the data pipeline.
+
+Code wraps each unit of work in ``stage(name, **labels)`` and fills in the
+bytes and rows it handled. While a ``StageRecorder`` is active (see
+``record``), every stage appends its wall time, CPU time, growth of the
+process peak RSS, bytes and rows to it; with no recorder active ``stage``
+costs next to nothing, so instrumented functions can be called from
+anywhere.
+
+The active recorder is a context variable, so pipelines running
+concurrently (in threads or tasks) each record only their own stages.
+Thread pools do not inherit it; submit work with ``submit`` to keep a
+pool's stages in the caller's run.
+
+A finished run is available as a JSON report and in the Prometheus text
+exposition format (for node_exporter's textfile collector), so refresh
+time regressions show up per stage, per run.
+"""
+
+import contextvars
+import cProfile
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from .atomic_io import atomic_write_json, atomic_write_text
+from .metrics import format_labels
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "singularity_clock_pipeline"
+
+PathLike = Union[str, Path]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Stage:
+    """Measurements of one stage; callers add to ``bytes`` and ``rows``."""
+
+    __slots__ = ("name", "labels", "bytes", "rows", "wall_seconds", "cpu_seconds",
+                 "peak_rss_growth_bytes", "status", "error")
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.bytes = 0
+        self.rows = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        # How far the process-wide peak RSS rose during the stage; 0 when the
+        # stage stayed under an earlier peak (or a concurrent stage's)
+        self.peak_rss_growth_bytes: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "labels": self.labels,
+            "status": self.status,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_rss_growth_bytes": self.peak_rss_growth_bytes,
+            "bytes": self.bytes,
+            "rows": self.rows,
+            "error": self.error,
+        }
+
+
+class StageRecorder:
+    """Collects the stages of one pipeline run; safe to use from several threads."""
+
+    def __init__(self, run: str):
+        self.run = run
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: List[Stage] = []
+        self.wall_seconds: Optional[float] = None
+
+    def add(self, stage: Stage) -> None:
+        with self._lock:
+            self.stages.append(stage)
+
+    def finish(self) -> None:
+        self.wall_seconds = time.perf_counter() - self._start
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = [stage.to_dict() for stage in self.stages]
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start
+        return {
+            "run": self.run,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(wall, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+    def write_report(self, path: PathLike) -> None:
+        atomic_write_json(path, self.report())
+
+    def to_prometheus(self) -> str:
+        return render_prometheus(self.report())
+
+    def write_prometheus(self, path: PathLike) -> None:
+        """Atomic write, as the node_exporter textfile collector requires."""
+        atomic_write_text(path, self.to_prometheus())
+
+
+# (suffix, help text, report field, how repeats of one stage combine)
+STAGE_METRICS = (
+    ("stage_wall_seconds", "Wall time of a pipeline stage in the last run.", "wall_seconds", sum),
+    ("stage_cpu_seconds", "CPU time of the thread running a pipeline stage in the last run.", "cpu_seconds", sum),
+    ("stage_bytes", "Bytes processed by a pipeline stage in the last run.", "bytes", sum),
+    ("stage_rows", "Rows processed by a pipeline stage in the last run.", "rows", sum),
+    ("stage_peak_rss_growth_bytes", "Growth of the process peak RSS during a pipeline stage in the last run.",
+     "peak_rss_growth_bytes", sum),
+    ("stage_success", "1 if every run of a pipeline stage succeeded in the last run.", "success", min),
+)
+
+
+def render_prometheus(report: Dict[str, Any]) -> str:
+    """A run report in the Prometheus text format (gauges, one series per stage and labels)."""
+    run_label = {"run": report["run"]}
+    grouped: Dict[Tuple, Dict[str, list]] = {}
+    for stage in report["stages"]:
+        labels = {**run_label, "stage": stage["stage"], **stage["labels"]}
+        key = tuple(sorted(labels.items()))
+        values = grouped.setdefault(key, {field: [] for _, _, field, _ in STAGE_METRICS})
+        for _, _, field, _ in STAGE_METRICS:
+            value = int(stage["status"] == "ok") if field == "success" else stage[field]
+            if value is not None:
+                values[field].append(value)
+
+    lines = []
+    for suffix, help_text, field, combine in STAGE_METRICS:
+        name = f"{METRIC_PREFIX}_{suffix}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for key, values in grouped.items():
+            if values[field]:
+                lines.append(f"{name}{format_labels(dict(key))} {combine(values[field])}")
+    started = datetime.fromisoformat(report["started_at"]).timestamp()
+    for suffix, help_text, value in (
+        ("run_wall_seconds", "Wall time of the last pipeline run.", report["wall_seconds"]),
+        ("run_start_timestamp_seconds", "Start time of the last pipeline run.", started),
+        ("run_peak_rss_bytes", "Process peak RSS after the last pipeline run.", report["peak_rss_bytes"]),
+    ):
+        if value is not None:
+            name = f"{METRIC_PREFIX}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name}{format_labels(run_label)} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+_active: contextvars.ContextVar[Optional[StageRecorder]] = contextvars.ContextVar(
+    "pipeline_metrics_recorder", default=None)
+
+
+@contextmanager
+def record(run: str) -> Iterator[StageRecorder]:
+    """Make a new recorder the active one in this context for the duration of the block."""
+    recorder = StageRecorder(run)
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        recorder.finish()
+        _active.reset(token)
+
+
+def submit(pool: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """``pool.submit`` that runs ``fn`` with the caller's active recorder."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@contextmanager
+def stage(name: str, **labels: str) -> Iterator[Stage]:
+    """Measure a block as one stage of the active run (if any).
+
+    CPU time is that of the calling thread, so concurrent stages (e.g. the
+    two downloads) do not count each other's work.
+    """
+    current = Stage(name, {key: str(value) for key, value in labels.items()})
+    recorder = _active.get()
+    if recorder is None:
+        yield current
+        return
+    wall, cpu, rss = time.perf_counter(), time.thread_time(), peak_rss_bytes()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "failed"
+        current.error = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        current.wall_seconds = time.perf_counter() - wall
+        current.cpu_seconds = time.thread_time() - cpu
+        if rss is not None:
+            current.peak_rss_growth_bytes = peak_rss_bytes() - rss
+        recorder.add(current)
+
+
+@contextmanager
+def profiled(path: Optional[PathLike]) -> Iterator[None]:
+    """Profile the block with cProfile and dump pstats to ``path`` (no-op when path is None).
+
+    Inspect the dump with ``python -m pstats`` or snakeviz.
+    """
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
+        logger.info(f"Profile written to {path}")
@@ -0,0 +1,111 @@
+"""Mergeable quantile sketch (merging t-digest).
+
+A digest summarises any number of values in at most ~``compression``
+centroids (mean, weight). Centroids near the tails are kept small and
+those near the median large (the k1 arcsine scale function), so extreme
+quantiles stay accurate. Two digests merge by pooling their centroids and
+compressing again, which is what lets per-batch digests be folded into
+the stored per-day and all-time ones.
+
+Reference: Dunning & Ertl, "Computing Extremely Accurate Quantiles Using
+t-Digests" (2019).
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_COMPRESSION = 100.0
+
+Centroid = Tuple[float, float]
+
+
+class TDigest:
+    """Merging t-digest over floats."""
+
+    __slots__ = ("compression", "centroids", "count", "min", "max")
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.centroids: List[Centroid] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _absorb(self, centroids: List[Centroid]) -> None:
+        """Compress the current centroids together with new ones."""
+        pooled = sorted(self.centroids + centroids)
+        total = sum(w for _, w in pooled)
+        merged: List[Centroid] = []
+        mean, weight = pooled[0]
+        seen = 0.0
+        k_lower = self._k(0.0)
+        for m, w in pooled[1:]:
+            if self._k((seen + weight + w) / total) - k_lower <= 1.0:
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                merged.append((mean, weight))
+                seen += weight
+                k_lower = self._k(seen / total)
+                mean, weight = m, w
+        merged.append((mean, weight))
+        self.centroids = merged
+        self.count = total
+
+    def update(self, values: Iterable[float]) -> "TDigest":
+        values = [float(v) for v in values]
+        if values:
+            self.min = min(self.min, min(values))
+            self.max = max(self.max, max(values))
+            self._absorb([(v, 1.0) for v in values])
+        return self
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if other.centroids:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._absorb(list(other.centroids))
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q in [0, 1]; None when empty."""
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1 or q <= 0:
+            return self.min if q <= 0 else self.centroids[0][0]
+        if q >= 1:
+            return self.max
+        target = q * self.count
+        # Interpolate between centroid midpoints, anchored at min and max
+        prev_pos, prev_val = 0.0, self.min
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            pos = cumulative + weight / 2
+            if target < pos:
+                span = pos - prev_pos
+                return prev_val + (mean - prev_val) * ((target - prev_pos) / span if span else 0.0)
+            prev_pos, prev_val = pos, mean
+            cumulative += weight
+        span = self.count - prev_pos
+        return prev_val + (self.max - prev_val) * ((target - prev_pos) / span if span else 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "min": self.min if self.centroids else None,
+            "max": self.max if self.centroids else None,
+            "centroids": [[round(m, 6), w] for m, w in self.centroids],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "TDigest":
+        digest = cls((data or {}).get("compression", DEFAULT_COMPRESSION))
+        if data and data.get("centroids"):
+            digest.centroids = [(float(m), float(w)) for m, w in data["centroids"]]
+            digest.count = sum(w for _, w in digest.centroids)
+            digest.min = float(data["min"])
+            digest.max = float(data["max"])
+        return digest
@@ -0,0 +1,367 @@
+"""Background refresh pipeline hosted by the API process.
+
+A run is four stages, none of which blocks the event loop:
+
+* fetch     - download the Epoch archives and harvest arXiv counts (threads;
+              a first arXiv backfill is spread over several runs)
+* parse     - summarize the archives and bulk-load them into PostgreSQL
+              (a spawned worker process, so pandas never competes with
+              request handling for the GIL)
+* composite - incremental CompositeHistory recompute (async DB session)
+* publish   - write current.json from the latest composite, which the
+              stream hub then pushes to clients
+
+Runs are single-flight: an in-process lock keeps scheduled and manual runs
+from overlapping, and an flock on ``refresh.lock`` does the same across
+API workers, so only one process refreshes at a time. Every stage's wall
+time and outcome is recorded in ``refresh_status.json``, along with the
+finer-grained ``pipeline_metrics`` stages (download, parse, write, ...)
+measured inside them.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from ..config import get_settings
+from . import json_codec, pipeline_metrics
+from .atomic_io import atomic_write_json
+from .data_store import DATA_DIR, ensure_data_dir, read_current, write_current
+
+logger = logging.getLogger(__name__)
+
+STATUS_PATH = DATA_DIR / "refresh_status.json"
+LOCK_PATH = DATA_DIR / "refresh.lock"
+
+# Placeholder until the sentiment hand is computed
+DEFAULT_VIBE_HAND = 50.0
+
+_run_lock = asyncio.Lock()
+_last_report: Optional[Dict[str, Any]] = None
+_scheduler: Optional[AsyncIOScheduler] = None
+
+
+class StageFailed(Exception):
+    """A stage failed; later stages that depend on it are skipped."""
+
+
+@contextmanager
+def _interprocess_lock() -> Iterator[bool]:
+    """Non-blocking exclusive lock on LOCK_PATH; yields False if another process holds it."""
+    if fcntl is None:
+        yield True
+        return
+    ensure_data_dir()
+    with open(LOCK_PATH, "a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class RunReport:
+    """Per-stage timings and outcomes of one pipeline run."""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.status = "running"
+
+    async def stage(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Await ``fn()`` as stage ``name``; failures are recorded and re-raised as StageFailed."""
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        except Exception as e:
+            self.stages[name] = {"status": "failed", "seconds": round(time.perf_counter() - start, 3),
+                                 "error": f"{e.__class__.__name__}: {e}"}
+            logger.error(f"Refresh stage {name} failed: {e}", exc_info=True)
+            raise StageFailed(name) from e
+        self.stages[name] = {"status": "ok", "seconds": round(time.perf_counter() - start, 3),
+                             "detail": result if isinstance(result, dict) else None}
+        logger.info(f"Refresh stage {name} finished in {self.stages[name]['seconds']}s")
+        return result
+
+    def skip(self, name: str, reason: str) -> None:
+        self.stages[name] = {"status": "skipped", "seconds": 0.0, "reason": reason}
+
+    def finish(self, status: str) -> Dict[str, Any]:
+        self.status = status
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(time.perf_counter() - self._start, 3),
+            "stages": self.stages,
+        }
+
+
+# ----------------------------------------------------------------------
+# Stage bodies
+# ----------------------------------------------------------------------
+
+def _fetch() -> Dict[str, Any]:
+    """Download both Epoch archives concurrently, then harvest new arXiv days."""
+    from .etl import arxiv_ingest, epoch_fetch
+
+    with pipeline_metrics.record("refresh.fetch") as recorder:
+        downloaded = epoch_fetch.download_epoch_datasets()
+        try:
+            with pipeline_metrics.stage("harvest", source="arxiv"):
+                arxiv = arxiv_ingest.harvest()
+        except Exception as e:
+            # Paper counts are optional input; stale counts are better than no run
+            logger.warning(f"arXiv harvest failed, keeping stored counts: {e}")
+            arxiv = {"mode": "failed", "error": str(e)}
+    return {"downloaded": downloaded, "arxiv": arxiv, "stages": recorder.report()["stages"]}
+
+
+def _parse_worker(dataset_types) -> Dict[str, Any]:
+    """Runs in the worker process."""
+    from .etl import epoch_fetch
+    with pipeline_metrics.record("refresh.parse") as recorder:
+        datasets = epoch_fetch.parse_epoch_datasets(dataset_types)
+    return {"datasets": datasets, "stages": recorder.report()["stages"]}
+
+
+def _load_worker() -> Dict[str, Any]:
+    """Runs in the worker process."""
+    from .etl import epoch_fetch
+    with pipeline_metrics.record("refresh.load") as recorder:
+        counts = epoch_fetch.load_epoch_into_database()
+    return {"counts": counts, "stages": recorder.report()["stages"]}
+
+
+async def _composite(papers_from: Optional[date] = None) -> Dict[str, Any]:
+    from ..database import get_session_maker
+    from . import composite_pipeline
+    from .etl import arxiv_ingest
+
+    paper_counts = await asyncio.to_thread(arxiv_ingest.load_paper_counts)
+    async with get_session_maker()() as session:
+        summary = await composite_pipeline.update_composite_history(
+            session, paper_counts=paper_counts or None, papers_from=papers_from)
+        await composite_pipeline.commit_and_save(session, summary)
+        # Also hands the new version to this process's /api/history validators
+        latest = await composite_pipeline.get_latest_composite(session)
+    return {
+        "mode": summary["mode"],
+        "start": summary["start"].isoformat() if summary["start"] else None,
+        "rows": summary["rows"],
+        "latest": None if latest is None else {
+            "snapshot_date": latest.snapshot_date.isoformat(),
+            "composite_value": latest.composite_value,
+            "compute_component": latest.compute_component,
+            "capability_component": latest.capability_component,
+            "papers_component": latest.papers_component,
+        },
+    }
+
+
+def _publish(latest: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    """Write current.json with the latest composite as the data hand.
+
+    Components are scaled against composite_pipeline.reference_bounds(), which
+    are published alongside; a component sitting at 100 has outgrown its
+    range, which is logged so the bounds can be raised.
+    """
+    from . import composite_pipeline
+
+    value = latest["composite_value"]
+    if not math.isfinite(value) or not 0.0 <= value <= 100.0:
+        raise ValueError(f"Composite value {value} is outside 0-100, not publishing")
+    saturated = [name for name in composite_pipeline.METRICS if latest[f"{name}_component"] == 100.0]
+    if saturated:
+        logger.warning(f"Components at the top of their reference bounds: {', '.join(saturated)} "
+                       f"(see COMPOSITE_<COMPONENT>_BOUNDS)")
+    current = {
+        "data_hand": value,
+        "vibe_hand": DEFAULT_VIBE_HAND,
+        "timestamp": datetime.now().isoformat(),
+        "snapshot_date": latest["snapshot_date"],
+        "components": {
+            "compute": latest["compute_component"],
+            "capability": latest["capability_component"],
+            "papers": latest["papers_component"],
+        },
+        "metadata": {
+            "refresh_run": run_id,
+            "reference_bounds": {name: list(bounds) for name, bounds in composite_pipeline.reference_bounds().items()},
+        },
+    }
+    if _same_publication(read_current(), current):
+        # Rewriting would only move the timestamp, and with it the ETag
+        # clients revalidate against and an SSE push to every stream
+        logger.info("Composite unchanged since the last publish, keeping current.json")
+        return {"data_hand": current["data_hand"], "snapshot_date": current["snapshot_date"], "unchanged": True}
+    write_current(current)
+    return {"data_hand": current["data_hand"], "snapshot_date": current["snapshot_date"], "unchanged": False}
+
+
+def _same_publication(previous: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """True if ``current`` says nothing ``previous`` did not (timestamp and run id aside)."""
+    fields = ("data_hand", "vibe_hand", "snapshot_date", "components")
+    return (
+        all(previous.get(field) == current[field] for field in fields)
+        and (previous.get("metadata") or {}).get("reference_bounds") == current["metadata"]["reference_bounds"]
+    )
+
+
+# ----------------------------------------------------------------------
+# Orchestration
+# ----------------------------------------------------------------------
+
+async def run_refresh(load_db: Optional[bool] = None) -> Dict[str, Any]:
+    """Run the whole pipeline once, unless a run is already in progress anywhere.
+
+    ``load_db`` overrides REFRESH_LOAD_DB for this run. Scheduled runs and
+    scripts/update_data.py both come through here, so they share the lock
+    and the single publish path.
+    """
+    global _last_report
+    if _run_lock.locked():
+        logger.info("Refresh already running in this process, skipping")
+        return {"status": "skipped", "reason": "already running"}
+    async with _run_lock:
+        with _interprocess_lock() as acquired:
+            if not acquired:
+                logger.info("Refresh running in another process, skipping")
+                return {"status": "skipped", "reason": "locked by another process"}
+            report = RunReport()
+            logger.info(f"Refresh run {report.run_id} started")
+            status = await _run_stages(report, load_db)
+            result = report.finish(status)
+    _last_report = result
+    try:
+        await asyncio.to_thread(atomic_write_json, STATUS_PATH, result)
+    except OSError as e:
+        logger.warning(f"Could not save refresh status: {e}")
+    logger.info(f"Refresh run {report.run_id} {status} in {result['seconds']}s")
+    return result
+
+
+async def _run_stages(report: RunReport, load_db: Optional[bool] = None) -> str:
+    settings = get_settings()
+    load_db = settings.refresh_load_db if load_db is None else load_db
+    loop = asyncio.get_running_loop()
+    # spawn, not fork: forking a process that runs an event loop and threads is unsafe
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    papers_from = None
+    try:
+        fetched = await report.stage("fetch", lambda: asyncio.to_thread(_fetch))
+        if fetched["arxiv"].get("start"):
+            papers_from = date.fromisoformat(fetched["arxiv"]["start"])
+        if fetched["downloaded"]:
+            await report.stage("parse", lambda: loop.run_in_executor(pool, _parse_worker, fetched["downloaded"]))
+        else:
+            report.skip("parse", "no archives downloaded")
+        if load_db:
+            await report.stage("load", lambda: loop.run_in_executor(pool, _load_worker))
+        else:
+            report.skip("load", "database load disabled")
+    except StageFailed:
+        # Stale inputs still produce a valid composite; carry on
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    try:
+        composite = await report.stage("composite", lambda: _composite(papers_from))
+    except StageFailed:
+        report.skip("publish", "composite failed")
+        return "failed"
+
+    if composite["latest"] is None or composite["latest"]["composite_value"] is None:
+        report.skip("publish", "no composite snapshot yet")
+        return "partial"
+    try:
+        await report.stage("publish", lambda: asyncio.to_thread(_publish, composite["latest"], report.run_id))
+    except StageFailed:
+        return "failed"
+    failed = any(stage["status"] == "failed" for stage in report.stages.values())
+    return "partial" if failed else "ok"
+
+
+def pipeline_report(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A run report in pipeline_metrics' report shape, with the finer stages of every stage."""
+    return {
+        "run": "refresh",
+        "started_at": result["started_at"],
+        "wall_seconds": result["seconds"],
+        "peak_rss_bytes": None,
+        "stages": [
+            sub
+            for stage in result.get("stages", {}).values()
+            for sub in ((stage.get("detail") or {}).get("stages") or [])
+        ],
+    }
+
+
+def get_last_report() -> Optional[Dict[str, Any]]:
+    """The most recent run report from this process, else the one on disk."""
+    if _last_report is not None:
+        return _last_report
+    try:
+        with open(STATUS_PATH, "rb") as f:
+            return json_codec.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Scheduler
+# ----------------------------------------------------------------------
+
+def start_scheduler() -> Optional[AsyncIOScheduler]:
+    """Schedule run_refresh on the running loop (no-op if REFRESH_ENABLED is off)."""
+    global _scheduler
+    settings = get_settings()
+    if not settings.refresh_enabled or _scheduler is not None:
+        return _scheduler
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    scheduler.add_job(
+        run_refresh,
+        IntervalTrigger(minutes=settings.refresh_interval_minutes, jitter=settings.refresh_jitter_seconds),
+        id="refresh",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=settings.refresh_interval_minutes * 30,
+        next_run_time=datetime.now(timezone.utc) + timedelta(seconds=settings.refresh_initial_delay_seconds),
+    )
+    scheduler.start()
+    _scheduler = scheduler
+    logger.info(f"Refresh scheduled every {settings.refresh_interval_minutes} min "
+                f"(±{settings.refresh_jitter_seconds}s jitter)")
+    return scheduler
+
+
+def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
@@ -0,0 +1,162 @@
+"""Incrementally maintained distribution of Sentiment hand positions.
+
+Each ``sentiment_aggregates`` row holds the count, sum, min/max, a
+unit-width histogram over [0, 100] and a t-digest for one UTC day, and
+one more row (period "all") holds the same for every submission ever
+made. The sentiment buffer folds each batch into the affected rows in the
+transaction that COPYs the batch, so the aggregates never drift from the
+submissions table, and reading a distribution costs one primary-key lookup
+and O(bins) work however many submissions exist.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.db_models import SentimentAggregate
+from . import json_codec
+from .quantile_sketch import TDigest
+
+logger = logging.getLogger(__name__)
+
+ALL_TIME = "all"
+VALUE_RANGE = (0.0, 100.0)
+HISTOGRAM_BINS = 100
+REPORTED_QUANTILES = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+
+
+def bin_index(value: float) -> int:
+    """Histogram bin of a value; 100 shares the top bin with [99, 100)."""
+    low, high = VALUE_RANGE
+    return min(int((value - low) / (high - low) * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)
+
+
+class Distribution:
+    """In-memory form of one aggregate row."""
+
+    __slots__ = ("count", "total", "min", "max", "histogram", "digest")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.digest = TDigest()
+
+    def add(self, values: Sequence[float]) -> "Distribution":
+        if not values:
+            return self
+        self.count += len(values)
+        self.total += sum(values)
+        low, high = min(values), max(values)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        for v in values:
+            self.histogram[bin_index(v)] += 1
+        self.digest.update(values)
+        return self
+
+    @classmethod
+    def from_row(cls, count, value_sum, value_min, value_max, histogram, sketch) -> "Distribution":
+        dist = cls()
+        dist.count, dist.total = int(count), float(value_sum)
+        dist.min, dist.max = value_min, value_max
+        if histogram:
+            dist.histogram = list(histogram)
+        dist.digest = TDigest.from_dict(sketch)
+        return dist
+
+    def summary(self, bins: int = HISTOGRAM_BINS) -> Dict[str, Any]:
+        """Counts, moments, quantiles and a histogram coarsened to ``bins`` (a divisor of 100)."""
+        width = HISTOGRAM_BINS // bins
+        low, high = VALUE_RANGE
+        step = (high - low) / bins
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {f"p{round(q * 100)}": self.digest.quantile(q) for q in REPORTED_QUANTILES},
+            "histogram": {
+                "edges": [round(low + i * step, 6) for i in range(bins + 1)],
+                "counts": [sum(self.histogram[i * width:(i + 1) * width]) for i in range(bins)],
+            },
+        }
+
+
+def _json_value(value):
+    """JSON column from asyncpg: text on a plain connection, decoded on SQLAlchemy's pooled ones."""
+    return json_codec.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def group_by_period(rows: Iterable[Tuple[float, Any, datetime]]) -> Dict[str, List[float]]:
+    """Values of a batch keyed by the aggregate rows they belong to."""
+    grouped: Dict[str, List[float]] = defaultdict(list)
+    for value, _, submitted_at in rows:
+        grouped[submitted_at.date().isoformat()].append(value)
+        grouped[ALL_TIME].append(value)
+    return grouped
+
+
+async def apply_batch(conn, rows: Sequence[Tuple[float, Any, datetime]]) -> int:
+    """Fold a batch of submissions into its day rows and the all-time row.
+
+    ``conn`` is an asyncpg connection inside the caller's transaction. Rows
+    are locked in period order so concurrent flushers (one per API worker)
+    serialise instead of deadlocking. Returns the number of rows updated.
+    """
+    grouped = group_by_period(rows)
+    periods = sorted(grouped)
+    empty_histogram = json_codec.dumps([0] * HISTOGRAM_BINS).decode("utf-8")
+    empty_sketch = json_codec.dumps(TDigest().to_dict()).decode("utf-8")
+    await conn.executemany(
+        """
+        INSERT INTO sentiment_aggregates (period, day, count, value_sum, histogram, sketch)
+        VALUES ($1, $2, 0, 0, $3::json, $4::json)
+        ON CONFLICT (period) DO NOTHING
+        """,
+        [(p, None if p == ALL_TIME else date.fromisoformat(p), empty_histogram, empty_sketch) for p in periods],
+    )
+    stored = await conn.fetch(
+        """
+        SELECT period, count, value_sum, value_min, value_max, histogram, sketch
+        FROM sentiment_aggregates
+        WHERE period = ANY($1::varchar[])
+        ORDER BY period
+        FOR UPDATE
+        """,
+        periods,
+    )
+    updates = []
+    for row in stored:
+        dist = Distribution.from_row(
+            row["count"], row["value_sum"], row["value_min"], row["value_max"],
+            _json_value(row["histogram"]), _json_value(row["sketch"]),
+        ).add(grouped[row["period"]])
+        updates.append((
+            row["period"], dist.count, dist.total, dist.min, dist.max,
+            json_codec.dumps(dist.histogram).decode("utf-8"),
+            json_codec.dumps(dist.digest.to_dict()).decode("utf-8"),
+        ))
+    await conn.executemany(
+        """
+        UPDATE sentiment_aggregates
+        SET count = $2, value_sum = $3, value_min = $4, value_max = $5,
+            histogram = $6::json, sketch = $7::json, updated_at = now()
+        WHERE period = $1
+        """,
+        updates,
+    )
+    return len(updates)
+
+
+async def read_distribution(session: AsyncSession, day: Optional[date] = None) -> Optional[Distribution]:
+    """The stored distribution for a UTC day, or all time; None if nothing was submitted."""
+    row = await session.get(SentimentAggregate, ALL_TIME if day is None else day.isoformat())
+    if row is None:
+        return None
+    return Distribution.from_row(row.count, row.value_sum, row.value_min, row.value_max, row.histogram, row.sketch)
@@ -0,0 +1,171 @@
+"""Write-behind buffer for Sentiment hand submissions.
+
+``POST /api/sentiment`` only validates a submission and appends it to an
+in-memory buffer; a background task COPYs the buffer into
+``sentiment_submissions`` in batches. A flush is triggered when
+``batch_size`` rows are pending or ``flush_interval`` seconds have passed,
+whichever comes first, so a burst of clicks costs a handful of COPYs rather
+than one transaction per click.
+
+When the buffer holds ``max_pending`` rows (the database is slow or down)
+``submit`` refuses new rows and the endpoint answers 503, instead of
+growing memory without bound. A failed batch is put back at the front of
+the buffer and retried on the next flush. Shutdown flushes whatever is
+left before the engine is disposed. Each batch also updates the
+pre-aggregated distributions (see ``sentiment_aggregates``).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from . import sentiment_aggregates
+
+logger = logging.getLogger(__name__)
+
+TABLE = "sentiment_submissions"
+COLUMNS = ("value", "client_id", "submitted_at")
+# Upper bound on the final flush when the app shuts down (seconds)
+SHUTDOWN_TIMEOUT = 10.0
+
+Row = Tuple[float, Optional[str], datetime]
+
+
+async def copy_rows(rows: List[Row]) -> None:
+    """COPY rows into sentiment_submissions and fold them into the aggregates, atomically."""
+    from ..database import get_engine
+
+    async with get_engine().connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        # One transaction, so a retried batch is never counted twice
+        async with raw.transaction():
+            await raw.copy_records_to_table(TABLE, records=rows, columns=list(COLUMNS))
+            await sentiment_aggregates.apply_batch(raw, rows)
+
+
+class SentimentBuffer:
+    """Bounded in-memory buffer flushed to PostgreSQL by one background task."""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, writer=copy_rows):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._writer = writer
+        self._pending: List[Row] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_seconds: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """Flush what is pending and stop the background task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Sentiment flush did not finish within {timeout}s; "
+                         f"{len(self._pending)} submissions lost")
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            ok = await self.flush()
+            if self._stopping:
+                if not ok and self._pending:
+                    logger.error(f"Sentiment flush failed at shutdown; {len(self._pending)} submissions lost")
+                return
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def submit(self, value: float, client_id: Optional[str] = None) -> bool:
+        """Queue one submission; False if the buffer is full (caller should back off)."""
+        if self._stopping or len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            return False
+        self._pending.append((value, client_id, datetime.now(timezone.utc).replace(tzinfo=None)))
+        self.accepted += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> bool:
+        """Write everything pending in batch_size chunks; False if a batch failed."""
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+            start = time.perf_counter()
+            try:
+                await self._writer(batch)
+            except Exception as e:
+                self.failures += 1
+                self._requeue(batch)
+                logger.warning(f"Sentiment batch of {len(batch)} failed, will retry: {e}")
+                return False
+            self.last_flush_seconds = round(time.perf_counter() - start, 6)
+            self.batches += 1
+            self.written += len(batch)
+        return True
+
+    def _requeue(self, batch: List[Row]) -> None:
+        """Put a failed batch back in front, dropping the oldest rows beyond max_pending."""
+        self._pending[:0] = batch
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.error(f"Sentiment buffer overflowed while the database was failing; dropped {overflow}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+_buffer: Optional[SentimentBuffer] = None
+
+
+def get_buffer() -> SentimentBuffer:
+    """Lazy creation of the process-wide buffer."""
+    global _buffer
+    if _buffer is None:
+        settings = get_settings()
+        _buffer = SentimentBuffer(
+            batch_size=settings.sentiment_batch_size,
+            flush_interval=settings.sentiment_flush_interval,
+            max_pending=settings.sentiment_max_pending,
+        )
+    return _buffer
@@ -0,0 +1,107 @@
+"""
+Stored baselines and the regression check shared by the benchmark scripts.
+
+baselines.json holds one result set per suite ("hot_paths", "load"), each a
+flat {metric: value} dict plus the machine it was recorded on. Values are
+seconds (lower is better) except metrics ending in ``_rps`` (higher is
+better). A metric regresses when it is worse than its baseline by more than
+``threshold`` (1.5 = 50% slower); metrics without a baseline are reported
+but never fail the check.
+"""
+
+import json
+import argparse
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+# In-process timings on shared machines are noisy; tighten on dedicated runners
+DEFAULT_THRESHOLD = 1.5
+
+HIGHER_IS_BETTER_SUFFIX = "_rps"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--check', action='store_true',
+                        help="compare against baselines.json and exit 1 on a regression")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store these results as the suite's baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown factor before --check fails (default {DEFAULT_THRESHOLD})")
+    parser.add_argument('--baseline-file', type=Path, default=BASELINE_FILE)
+
+
+def machine() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load(path: Path = BASELINE_FILE) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(suite: str, results: Dict[str, float], path: Path = BASELINE_FILE) -> None:
+    baselines = load(path)
+    baselines[suite] = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "machine": machine(),
+        "results": {name: round(value, 9) for name, value in sorted(results.items())},
+    }
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def slowdown(name: str, value: float, baseline: float) -> float:
+    """How many times worse than the baseline a result is (below 1 means faster)."""
+    if name.endswith(HIGHER_IS_BETTER_SUFFIX):
+        return baseline / value if value > 0 else float('inf')
+    return value / baseline if baseline > 0 else 1.0
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[Tuple[str, float, float, float]]:
+    """(metric, value, baseline, slowdown) for every metric worse than ``threshold``."""
+    regressions = []
+    for name, value in sorted(results.items()):
+        if name in baseline:
+            factor = slowdown(name, value, baseline[name])
+            if factor > threshold:
+                regressions.append((name, value, baseline[name], factor))
+    return regressions
+
+
+def finish(suite: str, results: Dict[str, float], args: argparse.Namespace) -> int:
+    """Apply --check / --save-baseline; returns the process exit code."""
+    if args.check:
+        stored = load(args.baseline_file).get(suite)
+        if stored is None:
+            print(f"\nNo '{suite}' baseline in {args.baseline_file}; run with --save-baseline first")
+            return 1
+        baseline = stored["results"]
+        print(f"\nAgainst baseline recorded {stored['recorded_at']} on {stored['machine']['platform']}:")
+        for name, value in sorted(results.items()):
+            if name in baseline:
+                print(f"  {name:<44} {slowdown(name, value, baseline[name]):6.2f}x")
+            else:
+                print(f"  {name:<44}    new")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold}x:")
+            for name, value, base, factor in regressions:
+                print(f"  {name}: {value:.6g} vs {base:.6g} ({factor:.2f}x)")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold}x")
+    if args.save_baseline:
+        save(suite, results, args.baseline_file)
+        print(f"\nSaved '{suite}' baseline to {args.baseline_file}")
+    return 0
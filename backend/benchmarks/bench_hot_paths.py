@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+Microbenchmark the pipeline and data-store hot paths on synthetic data at
+several sizes (default 1k, 100k and 1M rows):
+
+  normalizer   composite() and log-scaled normalize_series() over N days
+  history      HistoryStore extend, index load, full and windowed range
+               reads and tail() with N entries, plus a single fsync'd append
+  current      write_current and cached/revalidated current-state reads
+  parse        parse_models_dataset (in-memory and chunked) and
+               parse_benchmarks_dataset on N-row CSVs
+
+Results are best-of-``--repeat`` seconds, keyed "<group>.<case>[<rows>]",
+and can be stored as or checked against a baseline (see baseline.py).
+
+Usage: python benchmarks/bench_hot_paths.py [--sizes 1000,100000,1000000]
+           [--repeat N] [--only GROUP ...] [--check | --save-baseline]
+"""
+
+import sys
+import argparse
+import logging
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.services import data_store, normalizer
+from app.services.history_store import HistoryStore
+from app.services.etl.epoch_fetch import parse_benchmarks_dataset, parse_models_dataset
+
+import baseline
+from bench_json_codec import per_call_us
+from bench_parse_benchmarks import best_of, make_wide_csv
+
+SUITE = "hot_paths"
+GROUPS = ("normalizer", "history", "current", "parse")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+# Single appends are fsync-bound and O(1); this many are timed per size
+APPEND_SAMPLES = 50
+
+# Chunk size for the streaming models parse (EPOCH_MODELS_CHUNK_SIZE)
+MODELS_CHUNK_SIZE = 100_000
+
+DOMAINS = ['Language', 'Vision', 'Multimodal', 'Games', 'Speech', 'Language;Vision']
+
+
+def make_models_csv(path: Path, rows: int, seed: int = 0) -> None:
+    """Write a models export with the Epoch column names, sparse compute and a few unused columns."""
+    rng = np.random.default_rng(seed)
+    compute = 10 ** rng.uniform(15, 26, rows)
+    compute[rng.random(rows) < 0.4] = np.nan
+    parameters = 10 ** rng.uniform(6, 12, rows)
+    parameters[rng.random(rows) < 0.5] = np.nan
+    pd.DataFrame({
+        'Model': [f"model-{i}" for i in range(rows)],
+        'Domain': rng.choice(DOMAINS, rows),
+        'Organization': [f"org-{i % 500}" for i in range(rows)],
+        'Publication date': pd.date_range('1990-01-01', periods=rows, freq='h').strftime('%Y-%m-%d'),
+        'Training compute (FLOP)': compute,
+        'Parameters': parameters,
+        'Notability criteria': 'SOTA improvement',
+        'Confidence': 'Likely',
+        'Abstract': 'free text that the parser never reads',
+        'Link': 'https://example.org/paper',
+    }).to_csv(path, index=False)
+
+
+def composite_inputs(rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Daily inputs shaped like composite_pipeline's, with gaps in every series."""
+    rng = np.random.default_rng(seed)
+    data = {
+        'compute_flop': 10 ** np.linspace(18, 26, rows),
+        'benchmark_score': rng.uniform(0, 100, rows),
+        'paper_count': rng.integers(0, 5000, rows).astype(float),
+    }
+    for values in data.values():
+        values[rng.random(rows) < 0.1] = np.nan
+    return data
+
+
+def history_entries(rows: int) -> List[Dict[str, object]]:
+    start = datetime(2020, 1, 1)
+    return [
+        {
+            "timestamp": (start + timedelta(minutes=10 * i)).isoformat(),
+            "data_hand": 40 + (i % 500) * 0.071,
+            "vibe_hand": 50 + (i % 37) * 0.5,
+            "composite_value": 38.5 + (i % 1000) * 0.013,
+        }
+        for i in range(rows)
+    ]
+
+
+def bench_normalizer(rows: int, repeat: int, tmp: Path) -> Dict[str, float]:
+    data = composite_inputs(rows)
+    return {
+        'composite': best_of(lambda: normalizer.composite(data), repeat),
+        'normalize_series_log': best_of(lambda: normalizer.normalize_series(data['compute_flop'], log=True), repeat),
+    }
+
+
+def bench_history(rows: int, repeat: int, tmp: Path) -> Dict[str, float]:
+    entries = history_entries(rows)
+    window_start = entries[-max(1, rows // 100)]["timestamp"]
+
+    def open_store(directory: Path) -> HistoryStore:
+        # Retention off so the store really holds every entry
+        return HistoryStore(directory, segment_max_entries=data_store.HISTORY_SEGMENT_ENTRIES, max_segments=None)
+
+    counter = iter(range(10 ** 9))
+
+    def fresh_extend():
+        open_store(tmp / f"extend-{next(counter)}").extend(entries)
+
+    results = {'extend': best_of(fresh_extend, repeat)}
+
+    directory = tmp / "history"
+    store = open_store(directory)
+    store.extend(entries)
+    results['load_index'] = best_of(lambda: len(open_store(directory)), repeat)
+    results['iter_all'] = best_of(lambda: sum(1 for _ in store.iter_range()), repeat)
+    results['iter_last_1pct'] = best_of(lambda: sum(1 for _ in store.iter_range(window_start)), repeat)
+    results['tail_1000'] = per_call_us(lambda: store.tail(1000), repeat) / 1e6
+
+    start = time.perf_counter()
+    for entry in entries[:APPEND_SAMPLES]:
+        store.append(entry)
+    results['append_one'] = (time.perf_counter() - start) / APPEND_SAMPLES
+    return results
+
+
+def bench_current(rows: int, repeat: int, tmp: Path) -> Dict[str, float]:
+    """Size-independent: the state is one small document. Run once, at the first size."""
+    state = {
+        "data_hand": 73.4182, "vibe_hand": 50.0, "timestamp": datetime(2026, 10, 16, 12).isoformat(),
+        "components": {"compute": 81.2, "capability": 66.7, "papers": 58.9}, "status": "ok",
+    }
+
+    def reload():
+        data_store._current_cache.invalidate()
+        data_store.get_current_snapshot()
+
+    # Keep the real current.json out of it
+    data_dir, data_store.DATA_DIR = data_store.DATA_DIR, tmp / "data"
+    try:
+        results = {'write': best_of(lambda: data_store.write_current(state), repeat)}
+        data_store.get_current_snapshot()
+        results['read_cached'] = per_call_us(data_store.get_current_snapshot, repeat) / 1e6
+        results['read_reload'] = per_call_us(reload, repeat) / 1e6
+    finally:
+        data_store.DATA_DIR = data_dir
+        data_store._current_cache.invalidate()
+    return results
+
+
+def bench_parse(rows: int, repeat: int, tmp: Path) -> Dict[str, float]:
+    models_csv, benchmarks_csv = tmp / f"models-{rows}.csv", tmp / f"benchmarks-{rows}.csv"
+    make_models_csv(models_csv, rows)
+    make_wide_csv(benchmarks_csv, rows, 16)
+    return {
+        'models': best_of(lambda: parse_models_dataset(models_csv, chunksize=None), repeat),
+        'models_chunked': best_of(lambda: parse_models_dataset(models_csv, chunksize=MODELS_CHUNK_SIZE), repeat),
+        'benchmarks': best_of(lambda: parse_benchmarks_dataset(benchmarks_csv), repeat),
+    }
+
+
+BENCHES: Dict[str, Callable[[int, int, Path], Dict[str, float]]] = {
+    'normalizer': bench_normalizer,
+    'history': bench_history,
+    'current': bench_current,
+    'parse': bench_parse,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated row counts")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS))
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.sizes.split(',')]
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            for group in args.only:
+                if group == 'current' and rows != sizes[0]:
+                    continue
+                workdir = Path(tmp) / f"{group}-{rows}"
+                workdir.mkdir()
+                label = '' if group == 'current' else f"[{rows}]"
+                for case, seconds in BENCHES[group](rows, args.repeat, workdir).items():
+                    name = f"{group}.{case}{label}"
+                    results[name] = seconds
+                    print(f"{name:<44} {seconds * 1000:12.4f} ms")
+
+    sys.exit(baseline.finish(SUITE, results, args))
+
+
+if __name__ == "__main__":
+    main()
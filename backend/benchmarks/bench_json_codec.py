@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Compare JSON codecs on the payloads the API and data store handle: the
+current state and a 1000-entry history, encoded as the store used to write
+them (json, indent=2), compact json, and orjson.
+
+Usage: python benchmarks/bench_json_codec.py [--entries N] [--repeat N]
+"""
+
+import sys
+import json
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+
+
+def current_payload() -> Dict[str, Any]:
+    return {
+        "data_hand": 73.4182,
+        "vibe_hand": 50.0,
+        "timestamp": datetime(2026, 10, 16, 12, 0, 0),
+        "components": {"compute": 81.2, "capability": 66.7, "papers": 58.9},
+        "datasets_fetched": 2,
+        "status": "ok",
+    }
+
+
+def history_payload(entries: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(hours=6 * i),
+            "data_hand": 40 + (i % 500) * 0.071,
+            "vibe_hand": 50 + (i % 37) * 0.5,
+            "composite_value": 38.5 + i * 0.013,
+        }
+        for i in range(entries)
+    ]
+
+
+def codecs() -> Dict[str, Codec]:
+    result: Dict[str, Codec] = {
+        "json indent=2": (lambda o: json.dumps(o, indent=2, default=str).encode("utf-8"), json.loads),
+        "json compact": (lambda o: json.dumps(o, default=str, separators=(",", ":")).encode("utf-8"), json.loads),
+    }
+    if orjson is not None:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        result["orjson"] = (lambda o: orjson.dumps(o, default=str, option=options), orjson.loads)
+    return result
+
+
+def per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    """Best-of-``repeat`` microseconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed; only the json module is measured")
+
+    payloads = {"current": current_payload(), f"history[{args.entries}]": history_payload(args.entries)}
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        print(f"  {'codec':<14} {'encode us':>11} {'decode us':>11} {'bytes':>9}")
+        baseline = None
+        for codec_name, (dumps, loads) in codecs().items():
+            body = dumps(payload)
+            encode = per_call_us(lambda: dumps(payload), args.repeat)
+            decode = per_call_us(lambda: loads(body), args.repeat)
+            baseline = baseline or (encode, decode, len(body))
+            print(f"  {codec_name:<14} {encode:11.1f} {decode:11.1f} {len(body):9d}"
+                  f"   ({baseline[0] / encode:.1f}x / {baseline[1] / decode:.1f}x / {len(body) / baseline[2]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
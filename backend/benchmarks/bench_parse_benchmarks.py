@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark parse_benchmarks_dataset against the original per-pattern loop
+on a synthetic wide benchmarks CSV.
+
+Usage: python benchmarks/bench_parse_benchmarks.py [--rows N] [--columns N]
+"""
+
+import sys
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.services.etl.epoch_fetch import BENCHMARK_PATTERNS, parse_benchmarks_dataset
+
+
+def legacy_parse_benchmarks(csv_path: Path) -> Dict[str, Any]:
+    """The pre-rewrite implementation, kept here as the baseline."""
+    df = pd.read_csv(csv_path)
+    result = {'total_entries': len(df), 'benchmarks': {}, 'top_scores': {}}
+    for pattern in BENCHMARK_PATTERNS:
+        matching_cols = [col for col in df.columns if pattern.lower() in col.lower()]
+        for col in matching_cols:
+            scores = pd.to_numeric(df[col], errors='coerce')
+            valid_scores = scores.dropna()
+            if not valid_scores.empty:
+                result['benchmarks'][col] = {
+                    'max': float(valid_scores.max()),
+                    'mean': float(valid_scores.mean()),
+                    'count': int(len(valid_scores)),
+                    'latest_date': None
+                }
+                if 'date' in df.columns:
+                    date_col = df[df[col].notna()]['date']
+                    if not date_col.empty:
+                        result['benchmarks'][col]['latest_date'] = date_col.iloc[-1]
+    return result
+
+
+def make_wide_csv(path: Path, rows: int, columns: int, seed: int = 0) -> None:
+    """Write a sparse wide CSV; some names match several patterns (e.g. superglue/glue)."""
+    rng = np.random.default_rng(seed)
+    data = {
+        'model': [f"model-{i}" for i in range(rows)],
+        'date': pd.date_range('2015-01-01', periods=rows, freq='h').strftime('%Y-%m-%d'),
+    }
+    for i in range(columns):
+        name = f"{BENCHMARK_PATTERNS[i % len(BENCHMARK_PATTERNS)]}_variant_{i}"
+        values = rng.uniform(0, 100, rows)
+        values[rng.random(rows) < 0.7] = np.nan
+        data[name] = values
+    # A few non-benchmark columns the parser should skip
+    for i in range(max(1, columns // 4)):
+        data[f"notes_{i}"] = 'free text'
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--columns', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'benchmarks.csv'
+        make_wide_csv(csv_path, args.rows, args.columns)
+
+        legacy = legacy_parse_benchmarks(csv_path)
+        current = parse_benchmarks_dataset(csv_path)
+        assert current['total_entries'] == legacy['total_entries']
+        assert list(current['benchmarks']) == list(legacy['benchmarks']), "column order differs"
+        for col, expected in legacy['benchmarks'].items():
+            got = current['benchmarks'][col]
+            assert got['count'] == expected['count'] and got['latest_date'] == expected['latest_date'], col
+            assert np.isclose(got['max'], expected['max']) and np.isclose(got['mean'], expected['mean']), col
+
+        legacy_time = best_of(lambda: legacy_parse_benchmarks(csv_path), args.repeat)
+        current_time = best_of(lambda: parse_benchmarks_dataset(csv_path), args.repeat)
+
+    print(f"rows={args.rows} benchmark_columns={args.columns} benchmarks={len(current['benchmarks'])}")
+    print(f"legacy  : {legacy_time * 1000:9.1f} ms")
+    print(f"current : {current_time * 1000:9.1f} ms  ({legacy_time / current_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
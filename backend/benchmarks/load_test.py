@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Drive the FastAPI app in-process with concurrent clients and report
+latency percentiles and throughput per route scenario.
+
+Requests go through the whole ASGI stack (middleware, routing, handlers)
+via httpx's ASGITransport, with no sockets or server involved; numbers
+include the client's own overhead, so compare them with each other and
+with the stored baseline, not with figures from a real HTTP load test.
+
+  current           GET /api/current
+  current_304       GET /api/current revalidated with If-None-Match
+  history           GET /api/history, served from the rendered-history cache
+  history_304       GET /api/history revalidated with If-None-Match
+  history_uncached  GET /api/history cycling through more ``points``
+                    values than the render cache holds (DB read + LTTB
+                    + encode on every request)
+
+/api/current is served from a synthetic state in a temporary data
+directory. The history scenarios read the database configured by the
+POSTGRES_* settings (run the pipeline against it first) and are skipped
+when it is unreachable.
+
+Usage: python benchmarks/load_test.py [--concurrency N] [--requests N]
+           [--scenario NAME ...] [--check | --save-baseline]
+"""
+
+import sys
+import asyncio
+import argparse
+import logging
+import tempfile
+import time
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app import database
+from app.main import app
+from app.routes import clock
+from app.services import data_store
+
+import baseline
+
+SUITE = "load"
+SCENARIOS = ("current", "current_304", "history", "history_304", "history_uncached")
+
+# Request i of a scenario -> (path, extra headers)
+RequestFactory = Callable[[int], Tuple[str, Dict[str, str]]]
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request: RequestFactory,
+                       requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue ``requests`` requests from ``concurrency`` workers; latency in seconds."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    issued = count()
+
+    async def worker():
+        while True:
+            i = next(issued)
+            if i >= requests:
+                return
+            path, headers = make_request(i)
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "max": max(latencies),
+        "throughput_rps": requests / wall,
+        "statuses": statuses,
+    }
+
+
+async def validator(client: httpx.AsyncClient, path: str) -> Dict[str, str]:
+    response = await client.get(path)
+    response.raise_for_status()
+    return {"If-None-Match": response.headers["etag"]}
+
+
+async def build_scenarios(client: httpx.AsyncClient, names: List[str]) -> Dict[str, RequestFactory]:
+    scenarios: Dict[str, RequestFactory] = {}
+    if "current" in names:
+        scenarios["current"] = lambda i: ("/api/current", {})
+    if "current_304" in names:
+        headers = await validator(client, "/api/current")
+        scenarios["current_304"] = lambda i, headers=headers: ("/api/current", headers)
+
+    history = [name for name in names if name.startswith("history")]
+    if not history:
+        return scenarios
+    probe = await client.get("/api/history")
+    if probe.status_code != 200:
+        print(f"Skipping {', '.join(history)}: /api/history returned {probe.status_code} "
+              f"(is the database configured?)")
+        return scenarios
+    if not probe.json().get("dates"):
+        print("Warning: composite history is empty; history timings will not be representative")
+
+    if "history" in names:
+        scenarios["history"] = lambda i: ("/api/history", {})
+    if "history_304" in names:
+        headers = await validator(client, "/api/history")
+        scenarios["history_304"] = lambda i, headers=headers: ("/api/history", headers)
+    if "history_uncached" in names:
+        # Twice the cache size, so every request misses the LRU
+        cycle = clock.HISTORY_CACHE_ENTRIES * 2
+        scenarios["history_uncached"] = lambda i: (f"/api/history?points={400 + i % cycle}", {})
+    return scenarios
+
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, float] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        scenarios = await build_scenarios(client, args.scenario)
+        print(f"{'scenario':<18} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>9}  statuses")
+        for name, make_request in scenarios.items():
+            await run_scenario(client, make_request, args.warmup, args.concurrency)
+            stats = await run_scenario(client, make_request, args.requests, args.concurrency)
+            print(f"{name:<18} {stats['p50'] * 1000:9.3f} {stats['p90'] * 1000:9.3f} {stats['p99'] * 1000:9.3f} "
+                  f"{stats['max'] * 1000:9.3f} {stats['throughput_rps']:9.0f}  {stats['statuses']}")
+            for metric in ("p50", "p99", "throughput_rps"):
+                results[f"{name}.{metric}"] = stats[metric]
+    await database.dispose_engine()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000, help="requests per scenario")
+    parser.add_argument('--warmup', type=int, default=200, help="untimed requests per scenario")
+    parser.add_argument('--scenario', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_store.DATA_DIR = Path(tmp)
+        data_store.write_current({
+            "data_hand": 73.4182, "vibe_hand": 50.0, "timestamp": datetime.now().isoformat(),
+            "components": {"compute": 81.2, "capability": 66.7, "papers": 58.9},
+            "datasets_fetched": 2, "status": "ok",
+        })
+        results = asyncio.run(run(args))
+
+    sys.exit(baseline.finish(SUITE, results, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'organizations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('country', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_table(
+        'benchmarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('benchmark_name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('benchmark_type', sa.String(), nullable=True),
+        sa.Column('citation', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('benchmark_name'),
+    )
+    op.create_table(
+        'composite_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('compute_component', sa.Float(), nullable=True),
+        sa.Column('capability_component', sa.Float(), nullable=True),
+        sa.Column('papers_component', sa.Float(), nullable=True),
+        sa.Column('composite_value', sa.Float(), nullable=True),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'models',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('model_name', sa.String(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=True),
+        sa.Column('publication_date', sa.Date(), nullable=True),
+        sa.Column('domain', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('training_compute_flop', sa.Numeric(), nullable=True),
+        sa.Column('parameters', sa.Numeric(), nullable=True),
+        sa.Column('training_dataset_size', sa.Numeric(), nullable=True),
+        sa.Column('hardware_used', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('confidence', sa.String(), nullable=True),
+        sa.Column('citation_count', sa.Integer(), nullable=True),
+        sa.Column('notability_criteria', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('link', sa.String(), nullable=True),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('model_name'),
+    )
+    op.create_table(
+        'model_benchmark_scores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('model_id', sa.Integer(), nullable=True),
+        sa.Column('benchmark_id', sa.Integer(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('score_date', sa.Date(), nullable=True),
+        sa.Column('is_state_of_the_art', sa.Boolean(), nullable=True),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['benchmark_id'], ['benchmarks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('model_benchmark_scores')
+    op.drop_table('models')
+    op.drop_table('composite_history')
+    op.drop_table('benchmarks')
+    op.drop_table('organizations')
@@ -0,0 +1,60 @@
+"""Latest composite table and read-path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'latest_composite',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('compute_component', sa.Float(), nullable=True),
+        sa.Column('capability_component', sa.Float(), nullable=True),
+        sa.Column('papers_component', sa.Float(), nullable=True),
+        sa.Column('composite_value', sa.Float(), nullable=True),
+        sa.Column('extra_data', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.CheckConstraint('id = 1', name='latest_composite_single_row'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_composite_history_snapshot_date', 'composite_history', ['snapshot_date'])
+    op.create_index('ix_models_publication_date', 'models', ['publication_date'])
+    op.create_index(
+        'ix_model_benchmark_scores_benchmark_id_score_date',
+        'model_benchmark_scores',
+        ['benchmark_id', 'score_date'],
+    )
+
+    # Seed from existing history so the table is usable before the next pipeline run
+    op.execute("""
+        INSERT INTO latest_composite (id, snapshot_date, compute_component, capability_component,
+                                      papers_component, composite_value, extra_data)
+        SELECT 1, snapshot_date, compute_component, capability_component,
+               papers_component, composite_value, extra_data
+        FROM composite_history
+        ORDER BY snapshot_date DESC, id DESC
+        LIMIT 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_model_benchmark_scores_benchmark_id_score_date', table_name='model_benchmark_scores')
+    op.drop_index('ix_models_publication_date', table_name='models')
+    op.drop_index('ix_composite_history_snapshot_date', table_name='composite_history')
+    op.drop_table('latest_composite')
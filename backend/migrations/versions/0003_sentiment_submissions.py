@@ -0,0 +1,38 @@
+"""Sentiment submissions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sentiment_submissions',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('client_id', sa.String(length=64), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.CheckConstraint('value >= 0 AND value <= 100', name='sentiment_submissions_value_range'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sentiment_submissions_submitted_at', 'sentiment_submissions', ['submitted_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sentiment_submissions_submitted_at', table_name='sentiment_submissions')
+    op.drop_table('sentiment_submissions')
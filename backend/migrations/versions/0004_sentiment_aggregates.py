@@ -0,0 +1,41 @@
+"""Sentiment aggregates
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sentiment_aggregates',
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('day', sa.Date(), nullable=True),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('value_min', sa.Float(), nullable=True),
+        sa.Column('value_max', sa.Float(), nullable=True),
+        sa.Column('histogram', sa.JSON(), nullable=False),
+        sa.Column('sketch', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('period'),
+    )
+    op.create_index('ix_sentiment_aggregates_day', 'sentiment_aggregates', ['day'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sentiment_aggregates_day', table_name='sentiment_aggregates')
+    op.drop_table('sentiment_aggregates')
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the app and scripts packages from the backend directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,175 @@
+import re
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from app.services.etl import arxiv_ingest
+from app.services.etl.arxiv_ingest import ArxivHarvester
+
+CATEGORIES = ('cs.AI', 'cs.CL', 'cs.LG')
+FIRST_DAY = date(2024, 1, 1)
+LAST_DAY = date(2024, 1, 31)
+
+
+def make_papers():
+    """(id, submission day, categories): a few papers a day, with cross-listings and an off-topic one."""
+    papers = []
+    day = FIRST_DAY
+    while day <= LAST_DAY:
+        for i in range(day.day % 4 + 1):
+            papers.append((f"2401.{len(papers):05d}", day, {CATEGORIES[i % 3], CATEGORIES[(i + day.day) % 3]}))
+        papers.append((f"2401.{len(papers):05d}", day, {'cs.CV'}))
+        day += timedelta(days=1)
+    return papers
+
+
+PAPERS = make_papers()
+
+
+def month_days():
+    return [FIRST_DAY + timedelta(days=n) for n in range((LAST_DAY - FIRST_DAY).days + 1)]
+
+
+def expected_total(day: date) -> int:
+    return sum(1 for _, submitted, cats in PAPERS if submitted == day and cats & set(CATEGORIES))
+
+
+class FakeArxiv(ThreadingHTTPServer):
+    """Answers arXiv API queries from PAPERS, paging like the real thing."""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeArxivHandler)
+        self.hits = []
+        self.fail_from = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/api/query'
+
+
+class FakeArxivHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        search = query['search_query'][0]
+        cats = set(re.findall(r'cat:([\w.]+)', search))
+        first, last = (date(int(d[:4]), int(d[4:6]), int(d[6:8]))
+                       for d in re.search(r'\[(\d{8})0000 TO (\d{8})2359\]', search).groups())
+        offset, size = int(query['start'][0]), int(query['max_results'][0])
+        self.server.hits.append((first, last, offset))
+        if self.server.fail_from and first >= self.server.fail_from:
+            self.send_error(503)
+            return
+
+        matches = [p for p in PAPERS if first <= p[1] <= last and p[2] & cats]
+        entries = ''.join(
+            f'<entry><id>http://arxiv.org/abs/{paper_id}v2</id><published>{day}T12:00:00Z</published>'
+            + ''.join(f'<category term="{c}"/>' for c in sorted(paper_cats))
+            + '</entry>'
+            for paper_id, day, paper_cats in matches[offset:offset + size]
+        )
+        body = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+                f'<opensearch:totalResults>{len(matches)}</opensearch:totalResults>{entries}</feed>').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/atom+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api():
+    server = FakeArxiv()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def harvester(api):
+    # No rate limit and no retries: a failing request surfaces at once
+    with requests.Session() as session:
+        yield ArxivHarvester(CATEGORIES, api.url, session=session, min_interval=0.0, page_size=5)
+
+
+def test_window_is_paged_and_counted_once_per_paper(api, harvester):
+    start, end = date(2024, 1, 1), date(2024, 1, 7)
+    counts = harvester.harvest_window(start, end)
+
+    total = sum(expected_total(start + timedelta(days=d)) for d in range(7))
+    assert sorted(offset for _, _, offset in api.hits) == list(range(0, total, 5))
+    assert counts['2024-01-03'] == {
+        'total': expected_total(date(2024, 1, 3)),
+        **{c: sum(1 for _, d, cats in PAPERS if d == date(2024, 1, 3) and c in cats) for c in CATEGORIES},
+    }
+    assert sum(day['total'] for day in counts.values()) == total
+
+
+def test_crowded_window_is_split(api, harvester):
+    harvester.max_window_results = 10
+    counts = harvester.harvest_window(date(2024, 1, 1), date(2024, 1, 7))
+
+    assert {(first, last) for first, last, _ in api.hits} >= {
+        (date(2024, 1, 1), date(2024, 1, 7)), (date(2024, 1, 1), date(2024, 1, 4)),
+    }
+    assert all(counts[d.isoformat()]['total'] == expected_total(d)
+               for d in (date(2024, 1, 1) + timedelta(days=n) for n in range(7)))
+
+
+def test_next_run_starts_from_the_high_water_mark(api, harvester, tmp_path):
+    path = tmp_path / 'arxiv_counts.json'
+    first = arxiv_ingest.harvest(date(2024, 1, 14), FIRST_DAY, harvester, path, window_days=7, settle_days=3)
+    assert first['mode'] == 'full'
+    assert arxiv_ingest.load_counts(path)['harvested_through'] == '2024-01-14'
+
+    api.hits.clear()
+    second = arxiv_ingest.harvest(LAST_DAY, FIRST_DAY, harvester, path, window_days=7, settle_days=3)
+    assert second['mode'] == 'incremental'
+    # The last settle_days are fetched again, nothing before them
+    assert min(window_start for window_start, _, _ in api.hits) == date(2024, 1, 12)
+
+    stored = arxiv_ingest.load_counts(path)
+    assert stored['harvested_through'] == LAST_DAY.isoformat()
+    assert len(stored['daily']) == 31
+    assert stored['monthly']['2024-01']['total'] == sum(expected_total(d) for d in month_days())
+
+    api.hits.clear()
+    assert arxiv_ingest.harvest(LAST_DAY, FIRST_DAY, harvester, path, settle_days=0)['mode'] == 'noop'
+    assert api.hits == []
+
+
+def test_failed_run_resumes_after_the_last_saved_window(api, harvester, tmp_path):
+    path = tmp_path / 'arxiv_counts.json'
+    api.fail_from = date(2024, 1, 15)
+    with pytest.raises(requests.HTTPError):
+        arxiv_ingest.harvest(LAST_DAY, FIRST_DAY, harvester, path, window_days=7, settle_days=0)
+    assert arxiv_ingest.load_counts(path)['harvested_through'] == '2024-01-14'
+
+    api.fail_from = None
+    api.hits.clear()
+    resumed = arxiv_ingest.harvest(LAST_DAY, FIRST_DAY, harvester, path, window_days=7, settle_days=0)
+    assert resumed['start'] == '2024-01-15'
+    assert min(window_start for window_start, _, _ in api.hits) == date(2024, 1, 15)
+
+    daily = arxiv_ingest.load_counts(path)['daily']
+    assert all(daily[d.isoformat()]['total'] == expected_total(d) for d in month_days())
+
+
+def test_capped_backfill_continues_next_run(api, harvester, tmp_path):
+    path = tmp_path / 'arxiv_counts.json'
+    runs = []
+    while not runs or not runs[-1]['complete']:
+        runs.append(arxiv_ingest.harvest(LAST_DAY, FIRST_DAY, harvester, path,
+                                         window_days=7, settle_days=0, max_windows=2))
+
+    assert [run['harvested_through'] for run in runs] == ['2024-01-14', '2024-01-28', '2024-01-31']
+    assert len(arxiv_ingest.load_counts(path)['daily']) == 31
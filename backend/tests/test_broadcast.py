@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.main import app
+from app.services import broadcast
+from app.services.broadcast import BroadcastHub
+from app.services.data_store import CurrentSnapshot
+
+
+def snapshot(n: int) -> CurrentSnapshot:
+    body = b'{"data_hand": %d}' % n
+    return CurrentSnapshot({"data_hand": n}, body, f'"v{n}"', 0.0)
+
+
+def test_full_queue_evicts_the_slow_client():
+    async def run():
+        hub = BroadcastHub(queue_size=2)
+        slow, fast = hub.subscribe(), hub.subscribe()
+        received = []
+        for n in range(3):
+            delivered = hub.publish(snapshot(n))
+            received.append(await fast.next_frame(timeout=1))
+        return hub, slow, fast, delivered, received
+
+    hub, slow, fast, delivered, received = asyncio.run(run())
+
+    # The third frame found the slow client's two slots taken
+    assert delivered == 1
+    assert hub.stats() == {"clients": 1, "published": 3, "evicted": 1}
+    assert slow.closed and not fast.closed
+    assert slow.queue.qsize() == 1 and asyncio.run(slow.next_frame(timeout=1)) is None
+    assert [frame.split(b"\n")[0] for frame in received] == [b"id: v0", b"id: v1", b"id: v2"]
+
+
+def test_republishing_the_same_etag_is_a_no_op():
+    hub = BroadcastHub()
+    subscriber = hub.subscribe()
+    assert hub.publish(snapshot(1)) == 1
+    assert hub.publish(snapshot(1)) == 0
+    assert subscriber.queue.qsize() == 1
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = BroadcastHub()
+    hub.publish(snapshot(7))
+    monkeypatch.setattr(broadcast, "_hub", hub)
+    return hub
+
+
+def test_stream_unsubscribes_when_the_client_disconnects(hub):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/stream", "raw_path": b"/api/stream", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    sent, disconnected = [], asyncio.Event()
+    clients_while_open = []
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if b"event: current" in message.get("body", b""):
+            clients_while_open.append(hub.stats()["clients"])
+            disconnected.set()
+
+    asyncio.run(asyncio.wait_for(app(scope, receive, send), timeout=5))
+
+    assert sent[0]["status"] == 200
+    assert b"data: " + snapshot(7).body in b"".join(m.get("body", b"") for m in sent)
+    assert clients_while_open == [1]
+    assert hub.stats()["clients"] == 0
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.routes import clock
+from app.services import composite_pipeline, data_store
+
+VERSION = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def get(path, **headers):
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(request())
+
+
+@pytest.fixture
+def no_database(monkeypatch):
+    """Any attempt to open a session fails the request with a 503."""
+    def unavailable():
+        raise OSError("database is down")
+    monkeypatch.setattr(clock, "get_session_maker", unavailable)
+
+
+@pytest.fixture
+def known_version(monkeypatch):
+    monkeypatch.setattr(composite_pipeline, "_latest_version", None)
+    composite_pipeline.note_latest_version(VERSION)
+
+
+def test_history_revalidates_without_the_database(no_database, known_version):
+    etag, _ = clock._history_validators(VERSION, None, None, 500)
+
+    response = get("/api/history", **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_history_needs_the_database_once_the_version_expires(no_database, known_version, monkeypatch):
+    etag, _ = clock._history_validators(VERSION, None, None, 500)
+    monkeypatch.setattr(composite_pipeline, "LATEST_VERSION_TTL", -1.0)
+
+    assert get("/api/history", **{"If-None-Match": etag}).status_code == 503
+
+
+@pytest.fixture
+def composite_rows(monkeypatch):
+    """Serve a year and a half of daily composite rows without a database."""
+    dates = np.arange("2024-01-01", "2025-07-01", dtype="datetime64[D]")
+    values = np.linspace(10.0, 60.0, len(dates))
+    series = {name: values for name in ("composite_value", "compute_component",
+                                        "capability_component", "papers_component")}
+
+    async def read_composite_range(session, start, end):
+        return dates, series
+
+    monkeypatch.setattr(composite_pipeline, "read_composite_range", read_composite_range)
+    monkeypatch.setattr(clock, "get_session_maker", lambda: contextlib.nullcontext)
+    monkeypatch.setattr(clock, "_history_cache", OrderedDict())
+
+
+def test_history_has_an_etag_per_encoding(known_version, composite_rows):
+    base, _ = clock._history_validators(VERSION, None, None, 500)
+
+    gzipped = get("/api/history", **{"Accept-Encoding": "gzip"})
+    plain = get("/api/history", **{"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == base[:-1] + '-gzip"'
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == base
+    assert gzipped.json() == plain.json()
+
+    gzip_etag = gzipped.headers["etag"]
+    assert get("/api/history", **{"Accept-Encoding": "gzip", "If-None-Match": gzip_etag}).status_code == 304
+    assert get("/api/history", **{"Accept-Encoding": "gzip", "If-None-Match": "W/" + gzip_etag}).status_code == 304
+    assert get("/api/history", **{"Accept-Encoding": "br;q=0, gzip", "If-None-Match": gzip_etag}).status_code == 304
+    # A cached gzip body is not a valid identity representation
+    assert get("/api/history", **{"Accept-Encoding": "identity", "If-None-Match": gzip_etag}).status_code == 200
+
+
+def test_history_prefers_brotli_unless_refused(known_version, composite_rows):
+    pytest.importorskip("brotli")
+    base, _ = clock._history_validators(VERSION, None, None, 500)
+
+    assert get("/api/history", **{"Accept-Encoding": "gzip, br"}).headers["etag"] == base[:-1] + '-br"'
+    assert get("/api/history", **{"Accept-Encoding": "br;q=0, gzip"}).headers["etag"] == base[:-1] + '-gzip"'
+
+
+@pytest.fixture
+def current_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(clock, "_current_encoded", {})
+    data_store._current_cache.invalidate()
+    state = {"data_hand": 61.25, "vibe_hand": 50.0, "timestamp": "2026-10-16T12:00:00"}
+    data_store.write_current(state)
+    yield state
+    data_store._current_cache.invalidate()
+
+
+def test_small_current_snapshot_is_sent_as_is(current_state):
+    base = data_store.get_current_snapshot().etag
+
+    response = get("/api/current", **{"Accept-Encoding": "gzip"})
+
+    assert response.headers["etag"] == base
+    assert "content-encoding" not in response.headers and "vary" not in response.headers
+
+
+def test_current_has_an_etag_per_encoding(current_state, monkeypatch):
+    monkeypatch.setattr(clock, "COMPRESS_MIN_BYTES", 0)
+    base = data_store.get_current_snapshot().etag
+
+    gzipped = get("/api/current", **{"Accept-Encoding": "gzip"})
+    plain = get("/api/current", **{"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == base[:-1] + '-gzip"'
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert gzipped.json() == current_state
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == base
+
+    gzip_etag = gzipped.headers["etag"]
+    assert get("/api/current", **{"Accept-Encoding": "gzip", "If-None-Match": "W/" + gzip_etag}).status_code == 304
+    assert get("/api/current", **{"Accept-Encoding": "gzip", "If-None-Match": "*"}).status_code == 304
+    assert get("/api/current", **{"Accept-Encoding": "identity", "If-None-Match": gzip_etag}).status_code == 200
+    assert get("/api/current", **{"Accept-Encoding": "identity", "If-None-Match": base}).status_code == 304
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.services import composite_pipeline, normalizer
+from app.services.composite_pipeline import build_daily_inputs, reference_bounds, trailing_paper_rate
+
+START = date(2020, 1, 1)
+END = date(2024, 12, 31)
+
+
+def frontier_inputs(paper_counts=None):
+    """A steadily advancing frontier: a new record model every quarter, scores creeping up."""
+    days = (END - START).days
+    compute_rows = [(START + timedelta(days=d), 10 ** (22 + 3 * d / days)) for d in range(0, days, 90)]
+    score_rows = [(1, START + timedelta(days=d), 40 + 40 * d / days) for d in range(0, days, 30)]
+    return build_daily_inputs(START, END, None, compute_rows, {}, score_rows, paper_counts)
+
+
+def test_latest_composite_is_not_pinned_at_100():
+    paper_counts = {START + timedelta(days=d): 300.0 for d in range((END - START).days)}
+    dates, inputs = frontier_inputs(paper_counts)
+    rows = composite_pipeline._snapshot_rows(dates, inputs, reference_bounds())
+    latest = rows[-1]
+
+    assert latest["snapshot_date"] == END
+    assert 0 < latest["composite_value"] < 100
+    assert latest["compute_component"] < 100
+    assert latest["capability_component"] < 100
+    # The frontier moved, so the hand did too
+    assert rows[-1]["composite_value"] > rows[400]["composite_value"]
+
+
+def test_papers_component_survives_the_current_day():
+    # Harvested through yesterday, as arxiv_ingest does
+    paper_counts = {END - timedelta(days=d): float(d % 7 * 100) for d in range(1, 60)}
+    dates, inputs = frontier_inputs(paper_counts)
+
+    assert not np.isnan(inputs["paper_count"][-1])
+    assert inputs["paper_count"][-1] == inputs["paper_count"][-2]
+
+
+def test_paper_rate_is_a_trailing_mean_and_stops_carrying():
+    counts = {date(2024, 1, d): float(d) for d in range(1, 11)}
+    days = np.array([date(2024, 1, 10), date(2024, 1, 11), date(2024, 3, 1)], dtype="datetime64[D]")
+    rate = trailing_paper_rate(counts, pd.DatetimeIndex(days))
+
+    assert rate[0] == np.mean(range(1, 11))
+    assert rate[1] == rate[0]
+    assert np.isnan(rate[2])
+
+
+def test_fraction_scores_are_put_on_the_percent_scale():
+    score_rows = [(1, START, 0.5), (2, START, 50.0)]
+    _, inputs = build_daily_inputs(START, START + timedelta(days=1), None, [], {}, score_rows)
+
+    assert inputs["benchmark_score"][-1] == 50.0
+
+
+def test_values_beyond_reference_bounds_are_clamped():
+    values = normalizer.normalize_series([1e12, 1e24, 1e33], log=True, bounds=reference_bounds()["compute"])
+
+    assert values[0] == 0.0
+    assert 0 < values[1] < 100
+    assert values[2] == 100.0
@@ -0,0 +1,153 @@
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.services.etl import epoch_fetch
+from app.services.etl.epoch_fetch import DOWNLOAD_STATE_FILE, download_file, file_sha256
+
+
+def make_archive(rows: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr('models.csv', 'Model,Training compute (FLOP)\n' + ''.join(f'm{i},{i}e20\n' for i in range(rows)))
+    return buffer.getvalue()
+
+
+class ArchiveServer(ThreadingHTTPServer):
+    """Serves one archive with an ETag, honouring conditional and Range requests."""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ArchiveHandler)
+        self.publish(make_archive(2000))
+        self.honour_range = True
+        self.requests = []
+
+    def publish(self, body: bytes, etag: str = '"v1"') -> None:
+        self.body, self.etag = body, etag
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/ai-models.zip'
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.send_header('ETag', server.etag)
+            self.end_headers()
+            return
+        body, status = server.body, 200
+        range_header = self.headers.get('Range')
+        if range_header and server.honour_range and self.headers.get('If-Range', server.etag) == server.etag:
+            start = int(range_header[len('bytes='):].rstrip('-'))
+            body, status = server.body[start:], 206
+        self.send_response(status)
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{len(server.body) - 1}/{len(server.body)}')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ArchiveServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    # A plain session: no retries, so a wrong status fails the test at once
+    with requests.Session() as session:
+        yield session
+
+
+def state(directory):
+    with open(directory / DOWNLOAD_STATE_FILE) as f:
+        return json.load(f)['ai-models.zip']
+
+
+def start_partial(server, path, part: bytes) -> None:
+    """Leave an interrupted download behind, as a killed run would."""
+    path.with_name(path.name + '.part').write_bytes(part)
+    epoch_fetch.update_download_state(path, partial_url=server.url, partial_etag=server.etag)
+
+
+def test_unchanged_archive_is_revalidated_with_a_304(server, session, tmp_path):
+    path = tmp_path / 'ai-models.zip'
+
+    assert download_file(server.url, path, session)
+    assert path.read_bytes() == server.body
+    entry = state(tmp_path)
+    assert entry['url'] == server.url
+    assert entry['etag'] == '"v1"'
+    assert entry['sha256'] == file_sha256(path)
+    assert entry['size'] == len(server.body)
+    assert not any(key.startswith('partial_') for key in entry)
+
+    mtime = path.stat().st_mtime_ns
+    assert download_file(server.url, path, session)
+    assert server.requests[-1]['If-None-Match'] == '"v1"'
+    assert path.stat().st_mtime_ns == mtime
+    assert state(tmp_path) == entry
+
+
+def test_changed_archive_replaces_the_copy_and_its_state(server, session, tmp_path):
+    path = tmp_path / 'ai-models.zip'
+    assert download_file(server.url, path, session)
+
+    server.publish(make_archive(3000), etag='"v2"')
+    assert download_file(server.url, path, session)
+
+    assert path.read_bytes() == server.body
+    entry = state(tmp_path)
+    assert entry['etag'] == '"v2"'
+    assert entry['sha256'] == file_sha256(path)
+    assert entry['size'] == len(server.body)
+
+
+def test_interrupted_download_resumes_from_the_part_file(server, session, tmp_path):
+    path = tmp_path / 'ai-models.zip'
+    half = len(server.body) // 2
+    start_partial(server, path, server.body[:half])
+
+    assert download_file(server.url, path, session)
+
+    request = server.requests[-1]
+    assert request['Range'] == f'bytes={half}-'
+    assert request['If-Range'] == '"v1"'
+    assert path.read_bytes() == server.body
+    assert not path.with_name('ai-models.zip.part').exists()
+    entry = state(tmp_path)
+    assert entry['sha256'] == file_sha256(path)
+    assert not any(key.startswith('partial_') for key in entry)
+
+
+def test_full_response_to_a_range_request_restarts_from_zero(server, session, tmp_path):
+    path = tmp_path / 'ai-models.zip'
+    # Bytes of some other archive: appending the full body to them would corrupt it
+    start_partial(server, path, b'stale bytes' * 100)
+    server.honour_range = False
+
+    assert download_file(server.url, path, session)
+
+    assert 'Range' in server.requests[-1]
+    assert path.read_bytes() == server.body
+    assert state(tmp_path)['size'] == len(server.body)
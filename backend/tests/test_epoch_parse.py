@@ -0,0 +1,77 @@
+import math
+
+import pandas as pd
+import pytest
+
+from app.services.etl.epoch_fetch import ComputeAccumulator, parse_models_dataset
+
+CHUNK_SIZE = 4
+
+# (model, domain, publication date, training compute): ten models share
+# 2024-06-01, so chunk boundaries fall inside that date and the top-N tie
+# break has to follow row order across chunks
+MODELS = [
+    ('m00', 'Language', '2020-01-15', '3.1e21'),
+    ('m01', 'Vision', '2021-03-02', ''),
+    ('m02', 'Language', '2024-06-01', '2.0e24'),
+    ('m03', 'Multimodal,Language', '2024-06-01', ''),
+    ('m04', 'Games', '2024-06-01', '5.5e22'),
+    ('m05', 'Language', '2024-06-01', '1.2e25'),
+    ('m06', '', '2024-06-01', '7.0e23'),
+    ('m07', 'LLM', '2024-06-01', ''),
+    ('m08', 'Language', '2024-06-01', '0'),
+    ('m09', 'Speech', '2024-06-01', '4.4e20'),
+    ('m10', 'Language', '2024-06-01', '9.9e24'),
+    ('m11', 'Language', '2024-06-01', '1.0e24'),
+    ('m12', 'Vision', '', '6.0e22'),
+    ('m13', 'Language', '2023-11-30', ''),
+    ('m14', 'Language', '2024-06-02', '2.5e25'),
+    ('m15', 'Vision', '2022-07-07', '8.1e21'),
+    ('m16', 'Language', '2024-05-31', '3.3e24'),
+]
+
+
+@pytest.fixture
+def models_csv(tmp_path):
+    path = tmp_path / 'models.csv'
+    frame = pd.DataFrame(MODELS, columns=['Model', 'Domain', 'Publication date', 'Training compute (FLOP)'])
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_chunked_parse_matches_the_in_memory_parse(models_csv):
+    whole = parse_models_dataset(models_csv, chunksize=None)
+    chunked = parse_models_dataset(models_csv, chunksize=CHUNK_SIZE)
+
+    for result in (whole, chunked):
+        result.pop('last_updated')
+    assert pd.DataFrame(chunked.pop('recent_models')).equals(pd.DataFrame(whole.pop('recent_models')))
+    assert chunked == whole
+    assert whole['models_with_compute'] == 13
+
+
+def test_recent_models_keep_row_order_within_a_date(models_csv):
+    recent = parse_models_dataset(models_csv, chunksize=CHUNK_SIZE)['recent_models']
+
+    assert [record['model_name'] for record in recent] == [
+        'm14', 'm02', 'm03', 'm04', 'm05', 'm06', 'm07', 'm08', 'm09', 'm10',
+    ]
+
+
+@pytest.mark.parametrize('exact_median', [True, False])
+def test_accumulator_matches_pandas_across_chunks(exact_median):
+    values = pd.to_numeric(pd.Series([compute for *_, compute in MODELS]), errors='coerce')
+    accumulator = ComputeAccumulator(exact_median)
+    for start in range(0, len(values), CHUNK_SIZE):
+        accumulator.add(values[start:start + CHUNK_SIZE].dropna())
+
+    valid = values.dropna()
+    stats = accumulator.stats()
+    assert stats['total_models_with_compute'] == len(valid)
+    assert (stats['min_flop'], stats['max_flop']) == (valid.min(), valid.max())
+    assert math.isclose(stats['mean_flop'], valid.mean(), rel_tol=1e-12)
+    if exact_median:
+        assert stats['median_flop'] == valid.median()
+    else:
+        # The histogram median is interpolated within a 0.01-decade bin
+        assert math.isclose(stats['median_flop'], valid.median(), rel_tol=0.025)
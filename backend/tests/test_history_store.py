@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from app.services import data_store, history_store
+from app.services.history_store import HistoryStore
+
+
+def entry(day: int) -> dict:
+    return {"timestamp": f"2024-01-{day:02d}T12:00:00", "data_hand": float(day)}
+
+
+def days(entries) -> list:
+    return [int(e["data_hand"]) for e in entries]
+
+
+def make_store(directory, **kwargs) -> HistoryStore:
+    kwargs.setdefault("segment_max_entries", 3)
+    kwargs.setdefault("max_segments", None)
+    return HistoryStore(directory, fsync=False, **kwargs)
+
+
+def segment_files(directory) -> list:
+    return sorted(path.name for path in directory.glob("segment-*.jsonl"))
+
+
+def test_full_segment_rotates_to_a_new_one(tmp_path):
+    store = make_store(tmp_path)
+    store.extend([entry(d) for d in range(1, 8)])
+
+    assert segment_files(tmp_path) == ["segment-000001.jsonl", "segment-000002.jsonl", "segment-000003.jsonl"]
+    assert [len(path.read_text().splitlines()) for path in sorted(tmp_path.glob("segment-*"))] == [3, 3, 1]
+    assert days(store.iter_range()) == list(range(1, 8))
+
+
+def test_retention_drops_the_oldest_segments(tmp_path):
+    store = make_store(tmp_path, max_segments=2)
+    for day in range(1, 10):
+        store.append(entry(day))
+
+    assert segment_files(tmp_path) == ["segment-000002.jsonl", "segment-000003.jsonl"]
+    assert len(store) == 6
+    assert days(store.iter_range()) == list(range(4, 10))
+
+
+def test_torn_tail_is_repaired_on_reopen(tmp_path):
+    make_store(tmp_path).extend([entry(d) for d in range(1, 5)])
+    with open(tmp_path / "segment-000002.jsonl", "ab") as f:
+        f.write(b'{"timestamp": "2024-01-05T12:00:00", "data_')
+
+    store = make_store(tmp_path)
+    assert len(store) == 4
+    assert (tmp_path / "segment-000002.jsonl").read_bytes().endswith(b"\n")
+
+    store.append(entry(6))
+    assert days(make_store(tmp_path).iter_range()) == [1, 2, 3, 4, 6]
+
+
+def test_iter_range_only_opens_overlapping_segments(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    store.extend([entry(d) for d in range(1, 10)])
+    opened = []
+
+    def spy(path, *args, **kwargs):
+        opened.append(path.name)
+        return open(path, *args, **kwargs)
+
+    monkeypatch.setattr(history_store, "open", spy, raising=False)
+    selected = days(store.iter_range("2024-01-05T00:00:00", "2024-01-06T23:59:59"))
+
+    assert selected == [5, 6]
+    assert opened == ["segment-000002.jsonl"]
+
+
+def test_appends_by_another_process_are_picked_up_incrementally(tmp_path, monkeypatch):
+    reader, writer = make_store(tmp_path), make_store(tmp_path)
+    writer.extend([entry(d) for d in range(1, 3)])
+    assert len(reader) == 2
+
+    def reload():
+        raise AssertionError("full reload")
+
+    monkeypatch.setattr(reader, "_load", reload)
+    # Fills the active segment, then rotates into two more
+    writer.extend([entry(d) for d in range(3, 9)])
+
+    assert len(reader) == 8
+    assert days(reader.tail()) == list(range(1, 9))
+    assert days(reader.iter_range("2024-01-07T00:00:00")) == [7, 8]
+    assert reader.latest_timestamp().day == 8
+    assert [segment.number for segment in reader._segments] == [1, 2, 3]
+
+
+def test_segments_dropped_by_another_process_are_forgotten(tmp_path):
+    reader, writer = make_store(tmp_path), make_store(tmp_path, max_segments=2)
+    writer.extend([entry(d) for d in range(1, 5)])
+    assert len(reader) == 4
+
+    writer.extend([entry(d) for d in range(5, 8)])
+
+    assert len(reader) == 4
+    assert days(reader.iter_range()) == [4, 5, 6, 7]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def test_legacy_history_json_is_migrated_once(data_dir):
+    legacy = [entry(d) for d in range(1, 6)]
+    (data_dir / "history.json").write_text(json.dumps(legacy))
+    store = make_store(data_dir / "history")
+
+    data_store._migrate_legacy_history(store)
+
+    assert list(store.iter_range()) == legacy
+    assert not (data_dir / "history.json").exists()
+    assert (data_dir / "history.json.migrated").exists()
+
+    # A history.json reappearing later is not imported over existing history
+    (data_dir / "history.json").write_text(json.dumps([entry(9)]))
+    data_store._migrate_legacy_history(store)
+    assert len(store) == 5
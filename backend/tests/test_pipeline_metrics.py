@@ -0,0 +1,49 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import pipeline_metrics
+
+
+def run_pipeline(run: str, started: threading.Barrier, results: dict) -> None:
+    with pipeline_metrics.record(run) as recorder:
+        started.wait()
+        with pipeline_metrics.stage('parse', dataset=run):
+            # Both runs are inside a stage at the same time
+            started.wait()
+    results[run] = recorder.report()
+
+
+def test_overlapping_runs_record_only_their_own_stages():
+    started, results = threading.Barrier(2), {}
+    threads = [threading.Thread(target=run_pipeline, args=(run, started, results)) for run in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for run in ('a', 'b'):
+        assert [(s['stage'], s['labels']) for s in results[run]['stages']] == [('parse', {'dataset': run})]
+
+
+def test_pool_work_submitted_with_submit_joins_the_callers_run():
+    def download(name):
+        with pipeline_metrics.stage('download', file=name) as stage:
+            stage.bytes = 10
+
+    with pipeline_metrics.record('fetch') as recorder:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pipeline_metrics.submit(pool, download, name) for name in ('a.zip', 'b.zip')]
+            for future in futures:
+                future.result()
+            # A plain submit runs outside the run
+            pool.submit(download, 'c.zip').result()
+
+    stages = recorder.report()['stages']
+    assert sorted(s['labels']['file'] for s in stages) == ['a.zip', 'b.zip']
+    assert all(s['peak_rss_growth_bytes'] is None or s['peak_rss_growth_bytes'] >= 0 for s in stages)
+
+
+def test_stage_outside_a_run_is_not_recorded():
+    with pipeline_metrics.stage('write') as stage:
+        stage.rows = 1
+    assert stage.wall_seconds == 0.0
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.services.quantile_sketch import TDigest
+
+QUANTILES = (0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999)
+VALUES = np.random.default_rng(7).normal(50, 15, 20000)
+
+
+def rank_error(digest: TDigest, values: np.ndarray, q: float) -> float:
+    """How far the estimate's rank in the data is from q."""
+    return abs(np.searchsorted(np.sort(values), digest.quantile(q)) / len(values) - q)
+
+
+def test_quantiles_are_within_bounds_of_numpy_percentile():
+    digest = TDigest()
+    for batch in np.array_split(VALUES, 40):
+        digest.update(batch)
+
+    assert digest.count == len(VALUES)
+    assert len(digest.centroids) <= digest.compression
+    for q in QUANTILES:
+        assert rank_error(digest, VALUES, q) <= 0.005
+        assert digest.quantile(q) == pytest.approx(np.percentile(VALUES, q * 100), abs=1.0)
+    # Small centroids at the tails keep extreme quantiles tighter still
+    assert rank_error(digest, VALUES, 0.001) <= 0.0005
+    assert rank_error(digest, VALUES, 0.999) <= 0.0005
+
+
+def test_merged_digests_match_a_digest_of_all_values():
+    first, second = TDigest().update(VALUES[:12000]), TDigest().update(VALUES[12000:])
+    merged = TDigest().merge(first).merge(second)
+
+    assert merged.count == len(VALUES)
+    assert (merged.min, merged.max) == (VALUES.min(), VALUES.max())
+    for q in QUANTILES:
+        assert rank_error(merged, VALUES, q) <= 0.005
+
+
+def test_merge_survives_a_round_trip_through_to_dict():
+    stored = TDigest.from_dict(TDigest().update(VALUES[:5000]).to_dict())
+    stored.merge(TDigest().update(VALUES[5000:]))
+
+    assert stored.count == len(VALUES)
+    assert rank_error(stored, VALUES, 0.5) <= 0.005
+
+
+def test_empty_digest():
+    digest = TDigest()
+
+    assert digest.quantile(0.5) is None
+    assert digest.to_dict()["min"] is None and digest.to_dict()["max"] is None
+    assert TDigest.from_dict(None).quantile(0.5) is None
+    assert TDigest().update([]).merge(TDigest()).centroids == []
+    assert TDigest().update([3.0]).merge(digest).count == 1
+
+
+def test_single_value():
+    digest = TDigest().update([42.5])
+
+    assert [digest.quantile(q) for q in (0.0, 0.01, 0.5, 0.99, 1.0)] == [42.5] * 5
+    assert TDigest.from_dict(digest.to_dict()).quantile(0.5) == 42.5
@@ -0,0 +1,51 @@
+import pytest
+
+from app.services import data_store, refresh_pipeline
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_store, "DATA_DIR", tmp_path)
+    data_store._current_cache.invalidate()
+    yield tmp_path
+    data_store._current_cache.invalidate()
+
+
+def latest(value=61.25):
+    return {
+        "snapshot_date": "2026-10-16",
+        "composite_value": value,
+        "compute_component": 70.0,
+        "capability_component": 55.0,
+        "papers_component": 40.0,
+    }
+
+
+def test_unchanged_composite_is_not_republished(data_dir):
+    first = refresh_pipeline._publish(latest(), "run-1")
+    etag = data_store.get_current_snapshot().etag
+    mtime = (data_dir / "current.json").stat().st_mtime_ns
+
+    second = refresh_pipeline._publish(latest(), "run-2")
+
+    assert not first["unchanged"] and second["unchanged"]
+    assert (data_dir / "current.json").stat().st_mtime_ns == mtime
+    assert data_store.get_current_snapshot().etag == etag
+    assert data_store.read_current()["metadata"]["refresh_run"] == "run-1"
+
+
+def test_changed_composite_is_published(data_dir):
+    refresh_pipeline._publish(latest(), "run-1")
+    etag = data_store.get_current_snapshot().etag
+
+    result = refresh_pipeline._publish(latest(62.5), "run-2")
+
+    assert not result["unchanged"]
+    assert data_store.read_current()["data_hand"] == 62.5
+    assert data_store.get_current_snapshot().etag != etag
+
+
+def test_out_of_range_composite_is_rejected(data_dir):
+    with pytest.raises(ValueError):
+        refresh_pipeline._publish(latest(float("nan")), "run-1")
+    assert not (data_dir / "current.json").exists()
@@ -0,0 +1,72 @@
+import pytest
+from starlette.requests import Request
+
+from app import responses
+from app.responses import etag_matches, negotiate_encoding, variant_etag
+
+
+def request(accept_encoding=None) -> Request:
+    headers = [] if accept_encoding is None else [(b"accept-encoding", accept_encoding.encode("latin-1"))]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # Negotiation only checks that the optional package imported
+    monkeypatch.setattr(responses, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+
+
+@pytest.mark.parametrize("header, etag, expected", [
+    ('"abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('"xyz", W/"abc"', '"abc"', True),
+    ('"xyz"', '"abc"', False),
+    ('"abc-gzip"', '"abc"', False),
+    ("*", '"abc"', True),
+    (" * ", '"abc-gzip"', True),
+])
+def test_etag_matches(header, etag, expected):
+    assert etag_matches(header, etag) is expected
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("br, gzip", "br"),
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("br;q=0.5, gzip;q=0.8", "br"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=0, *;q=1", "br"),
+    ("GZip;q=0.3", "gzip"),
+    ("gzip;q=junk", None),
+])
+def test_negotiate_encoding(with_brotli, accept, expected):
+    assert negotiate_encoding(request(accept)) == expected
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("br, gzip", "gzip"),
+    ("br", None),
+    ("*", "gzip"),
+    ("gzip;q=0, *", None),
+])
+def test_negotiate_encoding_without_brotli(without_brotli, accept, expected):
+    assert negotiate_encoding(request(accept)) == expected
+
+
+def test_variant_etag():
+    assert variant_etag('"abc"', None) == '"abc"'
+    assert variant_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert variant_etag('"abc"', "br") == '"abc-br"'
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import sentiment_aggregates
+from app.services.sentiment_aggregates import ALL_TIME, Distribution, bin_index, group_by_period
+from app.services.sentiment_buffer import SentimentBuffer
+
+
+class AggregateTable:
+    """Aggregate rows kept as the table stores them, folded like apply_batch."""
+
+    def __init__(self, fail_first: int = 0):
+        self.rows = {}
+        self.fail_first = fail_first
+
+    async def write(self, batch):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise OSError("connection reset")
+        for period, values in group_by_period(batch).items():
+            stored = self.rows.get(period)
+            dist = Distribution.from_row(*stored) if stored else Distribution()
+            dist.add(values)
+            self.rows[period] = (dist.count, dist.total, dist.min, dist.max,
+                                 json.loads(json.dumps(dist.histogram)), json.loads(json.dumps(dist.digest.to_dict())))
+
+    def distribution(self, period: str) -> Distribution:
+        return Distribution.from_row(*self.rows[period])
+
+
+def flush_submissions(table: AggregateTable, values, batch_size: int = 40) -> SentimentBuffer:
+    buffer = SentimentBuffer(batch_size=batch_size, flush_interval=1.0, max_pending=1000, writer=table.write)
+    for value in values:
+        assert buffer.submit(value)
+
+    async def flush():
+        while not await buffer.flush():
+            pass
+    asyncio.run(flush())
+    return buffer
+
+
+def test_aggregates_count_every_flushed_submission():
+    values = [(i * 7.3) % 100 for i in range(150)]
+    table = AggregateTable()
+
+    buffer = flush_submissions(table, values)
+
+    assert buffer.stats()["batches"] == 4
+    today = datetime.now(timezone.utc).date().isoformat()
+    assert set(table.rows) == {today, ALL_TIME}
+    for period in (today, ALL_TIME):
+        summary = table.distribution(period).summary(bins=10)
+        assert summary["count"] == len(values)
+        assert sum(summary["histogram"]["counts"]) == len(values)
+        assert summary["mean"] == pytest.approx(sum(values) / len(values))
+        assert (summary["min"], summary["max"]) == (min(values), max(values))
+        assert summary["quantiles"]["p50"] == pytest.approx(sorted(values)[75], abs=2.0)
+
+
+def test_retried_batch_is_counted_once():
+    table = AggregateTable(fail_first=1)
+
+    buffer = flush_submissions(table, [50.0] * 30, batch_size=20)
+
+    assert buffer.stats()["failures"] == 1
+    assert table.distribution(ALL_TIME).count == 30
+
+
+def test_batch_is_split_by_utc_day():
+    rows = [(10.0, None, datetime(2026, 10, 15, 23, 59)), (20.0, None, datetime(2026, 10, 16, 0, 1)),
+            (30.0, "c1", datetime(2026, 10, 16, 8, 0))]
+
+    grouped = group_by_period(rows)
+
+    assert grouped == {"2026-10-15": [10.0], "2026-10-16": [20.0, 30.0], ALL_TIME: [10.0, 20.0, 30.0]}
+
+
+def test_histogram_bins():
+    assert [bin_index(v) for v in (0.0, 0.99, 1.0, 99.5, 100.0)] == [0, 0, 1, 99, 99]
+    assert sentiment_aggregates.HISTOGRAM_BINS == len(Distribution().histogram)
+    assert Distribution().summary()["mean"] is None
@@ -2,15 +2,31 @@
 const canvas = document.getElementById('clock');
 const ctx = canvas.getContext('2d');
 
+// Fallback polling interval when EventSource is unavailable (ms)
+const POLL_INTERVAL = 5 * 60 * 1000;
+
 function drawClock(dataHand, sentimentHand, vibeHand) {
     // TODO: draw clock face and hands
     console.log('Drawing clock...');
 }
 
-// On load, fetch data and draw
-fetch('/api/current')
-    .then(r => r.json())
-    .then(data => {
-        // For now, just draw with placeholder values
-        drawClock(42, 30, 50);
-    });
+function onSnapshot(data) {
+    // For now, just draw with placeholder values
+    drawClock(42, 30, 50);
+}
+
+function poll() {
+    fetch('/api/current')
+        .then(r => r.json())
+        .then(onSnapshot)
+        .finally(() => setTimeout(poll, POLL_INTERVAL));
+}
+
+// The server pushes the current snapshot on connect and again whenever it
+// changes; EventSource reconnects by itself if the stream drops.
+if (window.EventSource) {
+    const stream = new EventSource('/api/stream');
+    stream.addEventListener('current', event => onSnapshot(JSON.parse(event.data)));
+} else {
+    poll();
+}